@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Run research over many topics in one process and write per-topic reports as NDJSON.
+
+Usage:
+    python batch_research.py topics.txt --max-sources 3 --workers 8 --output reports.ndjson
+"""
+
+import sys
+import json
+import asyncio
+import argparse
+
+from models.schemas import ResearchRequest
+from core.batch import BatchRunner
+
+
+def load_requests(path: str, max_sources: int):
+    """Read one topic per line (blank lines and # comments are skipped)."""
+    with open(path) as f:
+        topics = [line.strip() for line in f]
+    return [ResearchRequest(topic=topic, max_sources=max_sources) for topic in topics if topic and not topic.startswith('#')]
+
+
+async def run_batch(args):
+    # Import here so the pipeline picks up the same configuration as the API server
+    from main import pipeline
+
+    requests = load_requests(args.topics, args.max_sources)
+    runner = BatchRunner(pipeline, max_workers=args.workers)
+    output = open(args.output, 'w') if args.output else sys.stdout
+
+    try:
+        async for event in runner.run(requests):
+            if event['event'] == 'stats':
+                stats = event['data']
+                print(
+                    f"📊 {stats['succeeded']}/{stats['topics']} topics in {stats['elapsed']:.1f}s "
+                    f"({stats['topics_per_second']:.2f} topics/s, {stats['unique_sources']} unique sources, "
+                    f"{stats['reused_summaries']} reused summaries)",
+                    file=sys.stderr
+                )
+            else:
+                status = "✅" if event['event'] == 'report' else "❌"
+                print(f"{status} {event['topic']} ({event['elapsed']:.1f}s)", file=sys.stderr)
+            output.write(json.dumps(event) + "\n")
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch research over a list of topics")
+    parser.add_argument("topics", help="File with one research topic per line")
+    parser.add_argument("--max-sources", type=int, default=3, help="Sources per topic")
+    parser.add_argument("--workers", type=int, default=4, help="Topics researched concurrently")
+    parser.add_argument("--output", help="NDJSON output file (defaults to stdout)")
+    asyncio.run(run_batch(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
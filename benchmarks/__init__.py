@@ -0,0 +1 @@
+# InsightSynth benchmarks
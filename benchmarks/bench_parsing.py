@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: compiled single-pass response parsers vs the original line walkers,
+and indexed insight attribution vs the original per-line scan over all summaries.
+
+Both parser sides end with the same SourceSummary / CrossInsight models the
+report is built from, so the comparison includes model construction.
+
+Usage:
+    python -m benchmarks.bench_parsing --lines 20000 --sources 60 --repeat 5 --output parsing.json
+"""
+
+import json
+import time
+import random
+import argparse
+from typing import Dict, Any, List
+
+from core.attribution import AttributionIndex
+from core.parsing import parse_summary, parse_insights
+from models.schemas import SourceSummary, CrossInsight
+
+WORDS = ("the results of this study suggest that the data analysis supports a broader research agenda "
+         "while measured outcomes vary across regions cohorts and time periods").split()
+
+
+def legacy_parse_summary(response: str, source: Dict) -> Dict[str, str]:
+    """The original AISummarizer._parse_summary_response, kept verbatim for comparison."""
+    lines = response.strip().split('\n')
+    result = {
+        'title': source.get('title', 'N/A'),
+        'url': source.get('url', 'N/A'),
+        'summary': '',
+        'core_argument': '',
+        'evidence_used': '',
+        'conclusion': '',
+        'credibility_score': source.get('credibility_score', 0.7)
+    }
+
+    current_section = None
+    for line in lines:
+        line = line.strip()
+        if line.startswith('- Summary:'):
+            current_section = 'summary'
+            result['summary'] = line.replace('- Summary:', '').strip()
+        elif line.startswith('- Core Argument:'):
+            current_section = 'core_argument'
+            result['core_argument'] = line.replace('- Core Argument:', '').strip()
+        elif line.startswith('- Evidence Used:'):
+            current_section = 'evidence_used'
+            result['evidence_used'] = line.replace('- Evidence Used:', '').strip()
+        elif line.startswith('- Conclusion:'):
+            current_section = 'conclusion'
+            result['conclusion'] = line.replace('- Conclusion:', '').strip()
+        elif current_section and line and not line.startswith('-'):
+            result[current_section] += ' ' + line
+
+    return result
+
+
+def legacy_parse_insights(response: str, summaries: List[Dict], parse_line) -> Dict[str, Any]:
+    """The original InsightGenerator._parse_insights_response, kept verbatim for comparison."""
+    sections = {
+        'cross_insights': [],
+        'contradictions': [],
+        'emerging_trends': [],
+        'key_takeaways': []
+    }
+
+    current_section = None
+    lines = response.split('\n')
+
+    for line in lines:
+        line = line.strip()
+
+        # Identify sections
+        if 'CROSS-INSIGHTS' in line.upper():
+            current_section = 'cross_insights'
+            continue
+        elif 'CONTRADICTIONS' in line.upper():
+            current_section = 'contradictions'
+            continue
+        elif 'EMERGING TRENDS' in line.upper():
+            current_section = 'emerging_trends'
+            continue
+        elif 'KEY TAKEAWAYS' in line.upper():
+            current_section = 'key_takeaways'
+            continue
+
+        # Parse content
+        if current_section and line.startswith('-'):
+            content = line[1:].strip()
+            if content:
+                if current_section == 'cross_insights':
+                    insight_data = parse_line(content, summaries)
+                    sections[current_section].append(insight_data)
+                else:
+                    sections[current_section].append(content)
+
+    return sections
+
+
+def legacy_parse_insight_line(line: str, summaries: List[Dict]) -> Dict[str, Any]:
+    """The original InsightGenerator._parse_insight_line, kept verbatim for comparison."""
+    # Simple parsing - in production, this could be more sophisticated
+    confidence = "Medium"  # Default
+    if "high confidence" in line.lower() or "strongly" in line.lower():
+        confidence = "High"
+    elif "low confidence" in line.lower() or "uncertain" in line.lower():
+        confidence = "Low"
+
+    # Extract supporting sources (simplified)
+    supporting_sources = []
+    for i, summary in enumerate(summaries, 1):
+        if f"source {i}" in line.lower() or summary.get('title', '').lower()[:20] in line.lower():
+            supporting_sources.append(summary.get('url', f'Source {i}'))
+
+    if not supporting_sources:
+        supporting_sources = [s.get('url', 'N/A') for s in summaries[:2]]  # Default to first 2
+
+    return {
+        'insight': line,
+        'supporting_sources': supporting_sources,
+        'confidence_level': confidence
+    }
+
+
+def sentence(rng: random.Random) -> str:
+    return ' '.join(rng.choices(WORDS, k=rng.randint(8, 24)))
+
+
+def make_summary_response(lines: int, rng: random.Random) -> str:
+    headers = ['- Summary:', '- Core Argument:', '- Evidence Used:', '- Conclusion:']
+    per_section = max(1, lines // len(headers))
+    parts = []
+    for header in headers:
+        parts.append(f"{header} {sentence(rng)}")
+        parts.extend(sentence(rng) for _ in range(per_section - 1))
+    return '\n'.join(parts)
+
+
+def make_insight_response(lines: int, rng: random.Random) -> str:
+    headers = ['CROSS-INSIGHTS (3-5 actionable insights):', 'EMERGING TRENDS:', 'KEY TAKEAWAYS:']
+    per_section = max(1, lines // len(headers))
+    parts = []
+    for header in headers:
+        parts.append(header)
+        for _ in range(per_section):
+            parts.append(f"- {sentence(rng)} (Source {rng.randint(1, 5)}, high confidence)")
+        parts.append('')
+    return '\n'.join(parts)
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LLM response parsing")
+    parser.add_argument("--lines", type=int, default=20000, help="Lines per synthetic response")
+    parser.add_argument("--sources", type=int, default=60, help="Summaries insights are attributed against")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write machine-readable results to this JSON file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    source = {'title': 'Synthetic source', 'url': 'https://example.edu/a', 'credibility_score': 0.8}
+    summaries = [{'title': f'Synthetic source {i}', 'url': f'https://example.edu/{i}'} for i in range(1, 6)]
+    summary_response = make_summary_response(args.lines, rng)
+    insight_response = make_insight_response(args.lines, rng)
+    # Parsers are compared with the same attribution so their output can be checked for equality
+    parse_line = legacy_parse_insight_line
+
+    # Each synthetic source has its own topical vocabulary on top of the shared words; every
+    # insight paraphrases one source, so attribution accuracy can be checked against it
+    topical = [[f"term{i}x{j}" for j in range(30)] for i in range(args.sources)]
+    attribution_summaries = [
+        {'title': f'{" ".join(rng.choices(topical[i], k=3))} report', 'url': f'https://example.edu/{i}',
+         'summary': f'{sentence(rng)} {" ".join(rng.choices(topical[i], k=15))}'}
+        for i in range(args.sources)
+    ]
+    insight_origins = [rng.randrange(args.sources) for _ in range(max(1, args.lines // 20))]
+    insight_lines = [f'{sentence(rng)} {" ".join(rng.choices(topical[i], k=3))}' for i in insight_origins]
+    # What the insight prompt asks for: the same insights naming their source
+    cited_lines = [f'{line} (Source {origin + 1}, high confidence)' for line, origin in zip(insight_lines, insight_origins)]
+
+    def legacy_attribution(lines=insight_lines):
+        return [legacy_parse_insight_line(line, attribution_summaries)['supporting_sources'] for line in lines]
+
+    def indexed_attribution(lines=insight_lines):
+        # A fresh index per response, as for summaries not seen before
+        index = AttributionIndex(attribution_summaries)
+        return [index.attribute(line.lower()) for line in lines]
+
+    def attribution_accuracy(attributed: List[List[str]]) -> float:
+        """Share of insights whose first supporting source is the one they were drawn from."""
+        hits = sum(bool(urls) and urls[0] == attribution_summaries[origin]['url']
+                   for urls, origin in zip(attributed, insight_origins))
+        return hits / len(insight_origins)
+
+    def legacy_summary():
+        return SourceSummary(**legacy_parse_summary(summary_response, source))
+
+    def legacy_insights():
+        sections = legacy_parse_insights(insight_response, summaries, parse_line)
+        sections['cross_insights'] = [CrossInsight(**insight) for insight in sections['cross_insights']]
+        return sections
+
+    results = {}
+    for name, legacy, compiled in (
+        ('summary', legacy_summary, lambda: parse_summary(summary_response, source)),
+        ('insights', legacy_insights, lambda: parse_insights(insight_response, summaries, parse_line)),
+        ('attribute', legacy_attribution, indexed_attribution),
+        ('cited', lambda: legacy_attribution(cited_lines), lambda: indexed_attribution(cited_lines)),
+    ):
+        legacy_seconds = best_of(args.repeat, legacy)
+        compiled_seconds = best_of(args.repeat, compiled)
+        results[name] = {
+            'legacy_seconds': legacy_seconds,
+            'compiled_seconds': compiled_seconds,
+            'speedup': legacy_seconds / compiled_seconds if compiled_seconds else 0.0,
+        }
+
+    summary_match = legacy_summary().model_dump() == parse_summary(summary_response, source).model_dump()
+    insights_match = legacy_insights() == parse_insights(insight_response, summaries, parse_line)
+
+    print(f"📊 {args.lines} lines per response, {len(insight_lines)} insights over {args.sources} sources, "
+          f"best of {args.repeat}")
+    for name, result in results.items():
+        print(f"{name:<9} legacy {result['legacy_seconds'] * 1000:8.2f} ms | compiled "
+              f"{result['compiled_seconds'] * 1000:8.2f} ms | speedup {result['speedup']:.2f}x")
+    accuracy = {'legacy': attribution_accuracy(legacy_attribution()), 'indexed': attribution_accuracy(indexed_attribution())}
+    print(f"identical output: summary {summary_match}, insights {insights_match}")
+    print(f"attribution accuracy: legacy {accuracy['legacy']:.1%}, indexed {accuracy['indexed']:.1%}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'lines': args.lines, 'sources': args.sources, 'results': results,
+                       'identical': {'summary': summary_match, 'insights': insights_match},
+                       'attribution_accuracy': accuracy}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
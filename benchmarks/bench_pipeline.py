@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark for the research pipeline using the mock backends.
+
+Drives either ResearchPipeline directly (``--mode inprocess``) or the FastAPI
+app over real HTTP (``--mode http``, served by uvicorn in this process unless
+``--url`` points at a running server) and reports throughput, p50/p95/p99
+end-to-end and per-stage latency, peak RSS and event-loop lag.
+
+Usage:
+    python -m benchmarks.bench_pipeline --requests 200 --concurrency 20 --seed 42 --output run.json
+    python -m benchmarks.bench_pipeline --mode http --compare run.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import logging
+import asyncio
+import argparse
+import platform
+import resource
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from core.metrics import percentile
+from core.loop_monitor import LoopMonitor
+
+DEFAULT_TOPICS = [
+    "artificial intelligence in healthcare",
+    "climate change solutions",
+    "quantum computing applications",
+    "renewable energy technologies",
+    "remote work productivity",
+]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        'count': len(values),
+        'mean': sum(values) / len(values) if values else 0.0,
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': max(values) if values else 0.0,
+    }
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def configure_environment(args):
+    """Force the mock backends and the requested latency model before main is imported."""
+    os.environ["ANTHROPIC_API_KEY"] = "your_anthropic_api_key_here"
+    os.environ["TAVILY_API_KEY"] = "your_tavily_api_key_here"
+    os.environ["MOCK_LATENCY_DISTRIBUTION"] = args.latency_distribution
+    os.environ["MOCK_LATENCY_SCALE"] = str(args.latency_scale)
+    if args.seed is not None:
+        os.environ["MOCK_LATENCY_SEED"] = str(args.seed)
+    if args.latency_trace:
+        os.environ["MOCK_LATENCY_TRACE"] = args.latency_trace
+
+
+def build_workload(args) -> List[Dict[str, Any]]:
+    topics = DEFAULT_TOPICS
+    if args.topics:
+        if os.path.exists(args.topics):
+            with open(args.topics) as f:
+                topics = [line.strip() for line in f if line.strip()]
+        else:
+            topics = [topic.strip() for topic in args.topics.split(',') if topic.strip()]
+
+    rng = random.Random(args.seed)
+    if args.mix == 'zipf':
+        # Topic i is requested with weight 1 / (i + 1) ** s, like real dashboard traffic
+        weights = [1 / (i + 1) ** args.zipf_s for i in range(len(topics))]
+        chosen = rng.choices(topics, weights=weights, k=args.requests)
+    else:
+        chosen = [topics[i % len(topics)] for i in range(args.requests)]
+
+    body = {'max_sources': args.max_sources}
+    if not args.cache:
+        body['cache_control'] = 'no-store'
+        # Identical in-flight requests are coalesced (and their sources share summaries), so
+        # without caching each request gets its own topic to make every request a full run
+        chosen = [f"{topic} {i + 1}" for i, topic in enumerate(chosen)]
+    return [{'topic': topic, **body} for topic in chosen]
+
+
+async def drive(workload: List[Dict[str, Any]], concurrency: int, call) -> List[Dict[str, Any]]:
+    """Issue the workload with at most ``concurrency`` requests outstanding."""
+    queue: asyncio.Queue = asyncio.Queue()
+    for body in workload:
+        queue.put_nowait(body)
+    results = []
+
+    async def client():
+        while True:
+            try:
+                body = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            try:
+                await call(body)
+                ok = True
+            except Exception:
+                ok = False
+            results.append({'ok': ok, 'latency': time.perf_counter() - started})
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return results
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def run_inprocess(workload, concurrency):
+    from main import pipeline
+    from models.schemas import ResearchRequest
+
+    return await drive(workload, concurrency, lambda body: pipeline.run(ResearchRequest(**body)))
+
+
+async def run_http(workload, concurrency, url: Optional[str]):
+    import aiohttp
+
+    server = None
+    if url is None:
+        import uvicorn
+        from main import app
+
+        port = free_port()
+        server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+        server_task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+        url = f"http://127.0.0.1:{port}"
+
+    try:
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=300)) as session:
+            async def call(body):
+                async with session.post(f"{url}/research", json=body) as response:
+                    response.raise_for_status()
+                    await response.read()
+
+            return await drive(workload, concurrency, call)
+    finally:
+        if server is not None:
+            server.should_exit = True
+            await server_task
+
+
+async def benchmark(args) -> Dict[str, Any]:
+    configure_environment(args)
+    import main as _  # noqa: F401  (builds the app and pipeline with the environment above)
+    from core.metrics import STAGE_SECONDS
+
+    # Per-request pipeline logging would dominate the benchmark's own output
+    logging.getLogger().setLevel(logging.WARNING)
+
+    stage_samples: Dict[str, List[float]] = {}
+
+    def record_stage(value: float, labels: Dict[str, Any]):
+        stage_samples.setdefault(labels.get('stage', 'unknown'), []).append(value)
+
+    workload = build_workload(args)
+    STAGE_SECONDS.add_listener(record_stage)
+    monitor = LoopMonitor(interval=0.01, threshold=0.1, window=1_000_000)
+    monitor.start()
+    started = time.perf_counter()
+    try:
+        if args.mode == 'http':
+            results = await run_http(workload, args.concurrency, args.url)
+        else:
+            results = await run_inprocess(workload, args.concurrency)
+    finally:
+        elapsed = time.perf_counter() - started
+        await monitor.stop()
+        STAGE_SECONDS.remove_listener(record_stage)
+
+    latencies = [r['latency'] for r in results if r['ok']]
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'config': {
+            'mode': args.mode,
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'max_sources': args.max_sources,
+            'mix': args.mix,
+            'cache': args.cache,
+            'seed': args.seed,
+            'latency_distribution': args.latency_distribution,
+            'latency_scale': args.latency_scale,
+        },
+        'elapsed_seconds': elapsed,
+        'throughput_rps': len(latencies) / elapsed if elapsed else 0.0,
+        # Requests answered from the report cache or merged into another in-flight run do not compile a report
+        'pipeline_runs': len(stage_samples.get('compile', [])),
+        'errors': len(results) - len(latencies),
+        'end_to_end': summarize(latencies),
+        'stages': {stage: summarize(values) for stage, values in sorted(stage_samples.items())},
+        'event_loop_lag': summarize(list(monitor.samples)),
+        'event_loop_stalls': monitor.stall_count,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def print_report(result: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    def delta(current: float, previous: Optional[float]) -> str:
+        if not previous:
+            return ''
+        return f" ({(current - previous) / previous * 100:+.1f}%)"
+
+    base_stages = (baseline or {}).get('stages', {})
+    print(f"\n📊 {result['config']['mode']} | {result['config']['requests']} requests @ concurrency {result['config']['concurrency']}")
+    print(f"Throughput: {result['throughput_rps']:.2f} req/s{delta(result['throughput_rps'], (baseline or {}).get('throughput_rps'))}"
+          f" | pipeline runs: {result.get('pipeline_runs', 0)}/{result['config']['requests']}"
+          f" | errors: {result['errors']} | peak RSS: {result['peak_rss_mb']:.1f} MB"
+          f" | loop stalls: {result['event_loop_stalls']}")
+    print(f"{'stage':<20}{'count':>8}{'p50':>10}{'p95':>10}{'p99':>10}")
+    rows = [('end_to_end', result['end_to_end'], (baseline or {}).get('end_to_end'))]
+    rows += [(stage, stats, base_stages.get(stage)) for stage, stats in result['stages'].items()]
+    rows += [('event_loop_lag', result['event_loop_lag'], (baseline or {}).get('event_loop_lag'))]
+    for name, stats, base in rows:
+        print(f"{name:<20}{stats['count']:>8}{stats['p50']:>10.4f}{stats['p95']:>10.4f}{stats['p99']:>10.4f}"
+              f"{delta(stats['p95'], (base or {}).get('p95'))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the research pipeline against the mock backends")
+    parser.add_argument("--mode", choices=["inprocess", "http"], default="inprocess")
+    parser.add_argument("--url", help="Benchmark an already running server instead of starting one (http mode)")
+    parser.add_argument("--requests", type=int, default=100, help="Total research requests")
+    parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight at once")
+    parser.add_argument("--max-sources", type=int, default=3)
+    parser.add_argument("--topics", help="Comma-separated topics or a file with one topic per line")
+    parser.add_argument("--mix", choices=["round-robin", "zipf"], default="round-robin", help="How topics are drawn")
+    parser.add_argument("--zipf-s", type=float, default=1.1, help="Zipf exponent for --mix zipf")
+    parser.add_argument("--cache", action="store_true", help="Allow report caching and repeated topics to share in-flight work "
+                             "(default: every request gets a unique topic and runs the full pipeline)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for topic mix and mock latencies")
+    parser.add_argument("--latency-distribution", default="uniform", choices=["uniform", "fixed", "lognormal", "replay"])
+    parser.add_argument("--latency-scale", type=float, default=0.1, help="Multiplier applied to mock latencies")
+    parser.add_argument("--latency-trace", help="JSON latency trace for the replay distribution")
+    parser.add_argument("--output", help="Write machine-readable results to this JSON file")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    args = parser.parse_args()
+
+    result = asyncio.run(benchmark(args))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: token-budgeted prompt content vs the original truncation.
+
+Summarization prompts used ``content[:2000]`` and insight prompts every
+summary in full. Synthetic pages mix on-topic evidence sentences (topic
+terms plus a figure) with filler spread through the whole page; the
+benchmark reports prompt tokens, the share of evidence sentences that
+reach the prompt, and the time spent compressing.
+
+Usage:
+    python -m benchmarks.bench_prompts --sources 20 --page-chars 8000 --output prompts.json
+"""
+
+import json
+import time
+import random
+import argparse
+from typing import Dict, Any
+
+from core.prompts import PromptBuilder, split_sentences
+from core.insights import InsightGenerator
+from core.scheduler import estimate_tokens
+
+TOPIC = "solar panel efficiency"
+FILLER = ("the page also covers navigation links newsletter signup cookie notices related articles "
+          "author biography comments sharing buttons and other boilerplate").split()
+EVIDENCE = ("panel efficiency", "solar output", "efficiency gains", "solar cells")
+
+
+def make_page(chars: int, rng: random.Random) -> str:
+    sentences = []
+    while sum(len(s) + 1 for s in sentences) < chars:
+        if rng.random() < 0.15:
+            sentences.append(f"Measured {rng.choice(EVIDENCE)} improved {rng.randint(2, 40)}% in a "
+                             f"{rng.randint(2015, 2024)} field trial.")
+        else:
+            sentences.append(' '.join(rng.choices(FILLER, k=rng.randint(8, 20))).capitalize() + '.')
+    return ' '.join(sentences)
+
+
+def evidence_kept(page: str, prompt_content: str) -> float:
+    evidence = [s for s in split_sentences(page) if s.startswith('Measured')]
+    return sum(s in prompt_content for s in evidence) / len(evidence) if evidence else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark token-budgeted prompt content")
+    parser.add_argument("--sources", type=int, default=20)
+    parser.add_argument("--page-chars", type=int, default=8000)
+    parser.add_argument("--source-tokens", type=int, default=400)
+    parser.add_argument("--prompt-tokens", type=int, default=6000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write machine-readable results to this JSON file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    builder = PromptBuilder(source_tokens=args.source_tokens, summaries_tokens=args.prompt_tokens)
+    sources = [{'title': f'Solar panel efficiency study {i}', 'url': f'https://example.edu/{i}',
+                'content': make_page(args.page_chars, rng)} for i in range(args.sources)]
+
+    started = time.perf_counter()
+    compressed = [builder.source_content(source) for source in sources]
+    compress_seconds = time.perf_counter() - started
+    truncated = [source['content'][:2000] for source in sources]
+
+    # Long summaries, as produced from full-text pages, for the insight prompt
+    summaries = [{'title': source['title'], 'url': source['url'], 'credibility_score': 0.8,
+                  'summary': source['content'][:1500], 'core_argument': source['content'][1500:2000],
+                  'evidence_used': source['content'][2000:3500], 'conclusion': source['content'][3500:4000]}
+                 for source in sources]
+    legacy_generator = InsightGenerator(prompt_builder=PromptBuilder(summaries_tokens=10 ** 9))
+    generator = InsightGenerator(max_prompt_tokens=args.prompt_tokens, prompt_builder=builder)
+
+    result: Dict[str, Any] = {
+        'sources': args.sources,
+        'summarize': {
+            'legacy_tokens': sum(map(estimate_tokens, truncated)),
+            'budgeted_tokens': sum(map(estimate_tokens, compressed)),
+            'legacy_evidence_kept': sum(map(evidence_kept, [s['content'] for s in sources], truncated)) / args.sources,
+            'budgeted_evidence_kept': sum(map(evidence_kept, [s['content'] for s in sources], compressed)) / args.sources,
+            'compress_ms_per_source': compress_seconds * 1000 / args.sources,
+        },
+        'insights': {
+            'legacy_tokens': estimate_tokens(legacy_generator._format_summaries_for_analysis(summaries, TOPIC)),
+            'budgeted_tokens': estimate_tokens(generator._format_summaries_for_analysis(summaries, TOPIC)),
+        },
+    }
+
+    summarize, insights = result['summarize'], result['insights']
+    print(f"📊 {args.sources} sources of {args.page_chars} chars, {args.source_tokens} tokens per source")
+    print(f"summarize prompts: {summarize['legacy_tokens']:,} -> {summarize['budgeted_tokens']:,} tokens | "
+          f"evidence kept {summarize['legacy_evidence_kept']:.1%} -> {summarize['budgeted_evidence_kept']:.1%} | "
+          f"{summarize['compress_ms_per_source']:.2f} ms per source")
+    print(f"insight prompt:    {insights['legacy_tokens']:,} -> {insights['budgeted_tokens']:,} tokens")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
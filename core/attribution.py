@@ -0,0 +1,186 @@
+"""
+Supporting-source attribution for generated insights.
+
+An AttributionIndex is shared by every insight response over the same
+summaries. Each insight line is attributed in one pass: explicit citations
+("Source 3", "Sources 1 and 4", "[2]") and quoted title prefixes come
+first; otherwise the line is matched against the summaries by TF-IDF
+cosine similarity over an inverted token index, which is only built once a
+line needs it. Lines with no evidence either way get no supporting sources
+rather than a default guess.
+"""
+
+import re
+import math
+import string
+import heapq
+from collections import Counter, OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+_TOKEN = re.compile(r'[a-z0-9]{3,}')
+# Matched against lowercased lines; the literal prefix lets the regex engine skip ahead to "source"
+_CITATION = re.compile(r'sources?\s*#?\s*(\d+(?:\s*(?:,|&|and|/)\s*#?\s*\d+)*)')
+_BRACKET_CITATION = re.compile(r'\[(\d+)\]')
+_NUMBER = re.compile(r'\d+')
+
+STOPWORDS = frozenset("""
+the and for are but not you all any can had her was one our out has have this that with from they will
+would there their what about which when make like time just know take into year your some could them than
+then now only come its over also back after use two how work first well way even new want because these give
+most more such while where other within across between source sources insight insights confidence high medium low
+""".split())
+
+SUMMARY_TEXT_FIELDS = ('title', 'summary', 'core_argument', 'evidence_used', 'conclusion')
+
+# Indexes of recently seen summary sets, keyed on their urls and text
+INDEX_CACHE_SIZE = 64
+_INDEXES: "OrderedDict[tuple, AttributionIndex]" = OrderedDict()
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class AttributionIndex:
+    """Per-request index mapping insight text to the summaries that support it.
+
+    Only citations and titles are prepared up front; the TF-IDF postings are
+    built the first time a line has neither and needs the similarity fallback.
+    """
+
+    def __init__(self, summaries: List[Dict[str, Any]], title_prefix_chars: int = 20, min_title_chars: int = 8,
+                 min_similarity: float = 0.1, relative_similarity: float = 0.5, max_sources: int = 3,
+                 max_document_frequency: float = 0.5):
+        self.urls = [summary.get('url', f'Source {i}') for i, summary in enumerate(summaries, 1)]
+        self.min_similarity = min_similarity
+        self.relative_similarity = relative_similarity
+        self.max_sources = max_sources
+        self.max_document_frequency = max_document_frequency
+        self._summaries = summaries
+        self._postings: Optional[Dict[str, List[Tuple[int, float]]]] = None
+        self._vectors: Optional[List[Dict[str, float]]] = None
+
+        # Lowercased title prefixes, computed once; short titles would match almost anything
+        title_sources: Dict[str, List[int]] = {}
+        for index, summary in enumerate(summaries):
+            prefix = (summary.get('title') or '').lower()[:title_prefix_chars].strip()
+            if len(prefix) >= min_title_chars:
+                title_sources.setdefault(prefix, []).append(index)
+        # Prefixes that start with a whole word are only checked when the line contains that word
+        self._titles_by_word: Dict[str, List[tuple]] = {}
+        self._unanchored_titles: List[tuple] = []
+        for prefix, indexes in title_sources.items():
+            words = prefix.split(None, 1)
+            anchor = words[0].strip(string.punctuation)
+            if len(words) > 1 and anchor:
+                self._titles_by_word.setdefault(anchor, []).append((prefix, indexes))
+            else:
+                self._unanchored_titles.append((prefix, indexes))
+
+    @classmethod
+    def for_summaries(cls, summaries: List[Dict[str, Any]]) -> "AttributionIndex":
+        """The shared index for a summary set, reused while the same summaries keep coming back.
+
+        Map-reduce insight generation clusters and then attributes over the
+        same summaries, and repeated topics reuse cached summaries.
+        """
+        key = tuple(tuple(str(summary.get(field) or '') for field in ('url',) + SUMMARY_TEXT_FIELDS)
+                    for summary in summaries)
+        index = _INDEXES.get(key)
+        if index is None:
+            index = _INDEXES[key] = cls(summaries)
+            if len(_INDEXES) > INDEX_CACHE_SIZE:
+                _INDEXES.popitem(last=False)
+        else:
+            _INDEXES.move_to_end(key)
+        return index
+
+    @property
+    def postings(self) -> Dict[str, List[Tuple[int, float]]]:
+        """Token -> (summary index, normalized TF-IDF weight) for every summary containing it."""
+        if self._postings is None:
+            self._build_postings()
+        return self._postings
+
+    @property
+    def vectors(self) -> List[Dict[str, float]]:
+        """Normalized TF-IDF vector of each summary."""
+        if self._vectors is None:
+            self._vectors = [{} for _ in self.urls]
+            for token, entries in self.postings.items():
+                for index, weight in entries:
+                    self._vectors[index][token] = weight
+        return self._vectors
+
+    def _build_postings(self):
+        documents = [Counter(tokenize(' '.join(str(summary.get(field) or '') for field in SUMMARY_TEXT_FIELDS)))
+                     for summary in self._summaries]
+        document_frequency = Counter(token for document in documents for token in document)
+        count = len(documents)
+        # Tokens shared by (most of) the summaries cannot tell them apart; leaving them out
+        # of the index also keeps the posting lists short when there are many sources
+        common = count if count < 10 else count * self.max_document_frequency
+        self.idf = {
+            token: math.log((count + 1) / (df + 1)) + 1
+            for token, df in document_frequency.items() if count < 2 or df < common
+        }
+        postings: Dict[str, List[Tuple[int, float]]] = {}
+        for index, document in enumerate(documents):
+            weights = [(token, tf * self.idf[token]) for token, tf in document.items() if token in self.idf]
+            norm = math.sqrt(sum(w * w for _, w in weights)) or 1.0
+            for token, weight in weights:
+                postings.setdefault(token, []).append((index, weight / norm))
+        self._postings = postings
+        self.rare_postings = max(2, int(count * 0.1))
+
+    def cited(self, line_lower: str) -> List[int]:
+        """Summary indexes cited explicitly by number, then by title in summary order."""
+        found: List[int] = []
+        numbers: List[str] = []
+        for match in _CITATION.finditer(line_lower):
+            if match.start() == 0 or not line_lower[match.start() - 1].isalnum():
+                numbers.extend(_NUMBER.findall(match.group(1)))
+        if '[' in line_lower:
+            numbers.extend(_BRACKET_CITATION.findall(line_lower))
+        for number in numbers:
+            index = int(number) - 1
+            if 0 <= index < len(self.urls) and index not in found:
+                found.append(index)
+
+        titled = set()
+        titles = self._titles_by_word
+        for word in {word.strip(string.punctuation) for word in line_lower.split()}:
+            for prefix, indexes in titles.get(word, ()):
+                if prefix in line_lower:
+                    titled.update(indexes)
+        for prefix, indexes in self._unanchored_titles:
+            if prefix in line_lower:
+                titled.update(indexes)
+        found.extend(index for index in sorted(titled) if index not in found)
+        return found
+
+    def similar(self, line_lower: str) -> List[int]:
+        """Summary indexes whose content is most similar to the line, best first."""
+        postings = self.postings
+        weights = {token: tf * self.idf[token] for token, tf in Counter(tokenize(line_lower)).items() if token in self.idf}
+        if not weights:
+            return []
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+
+        scores: Dict[int, float] = {}
+        for token, weight in weights.items():
+            for index, document_weight in postings[token]:
+                scores[index] = scores.get(index, 0.0) + weight * document_weight
+
+        # Candidates come from the line's rarer tokens when it has any, so summaries
+        # sharing only common tokens with the line are not ranked
+        rare = [postings[token] for token in weights if len(postings[token]) <= self.rare_postings]
+        candidates = {index for entries in rare for index, _ in entries} if rare else scores
+        ranked = heapq.nlargest(self.max_sources, ((scores[index] / norm, index) for index in candidates))
+        cutoff = max(self.min_similarity, ranked[0][0] * self.relative_similarity)
+        return [index for score, index in ranked if score >= cutoff]
+
+    def attribute(self, line_lower: str) -> List[str]:
+        """URLs of the summaries supporting a (lowercased) insight line."""
+        indexes = self.cited(line_lower) or self.similar(line_lower)
+        return [self.urls[index] for index in indexes]
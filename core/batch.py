@@ -0,0 +1,114 @@
+import asyncio
+import time
+from typing import List, Dict, Any, AsyncIterator
+import logging
+
+from core.pipeline import ResearchPipeline
+from core.scheduler import current_priority, BATCH
+from models.schemas import ResearchRequest
+
+logger = logging.getLogger(__name__)
+
+
+class SharedSourceSummarizer:
+    """Summarizer wrapper that summarizes each source URL only once per batch.
+
+    Search snippets for the same page differ between queries, so content-hash
+    caching alone misses overlap between topics; within a batch the first
+    summary produced for a URL is reused by every topic that finds it.
+    """
+
+    def __init__(self, summarizer):
+        self.summarizer = summarizer
+        self._by_url: Dict[str, asyncio.Task] = {}
+        self.reused = 0
+
+    async def summarize_source(self, source: Dict[str, Any]) -> Dict[str, Any]:
+        url = source.get('url')
+        task = self._by_url.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self.summarizer.summarize_source(source))
+            self._by_url[url] = task
+        else:
+            self.reused += 1
+
+        summary = await asyncio.shield(task)
+        return {**summary, 'credibility_score': source.get('credibility_score', summary['credibility_score'])}
+
+    async def generate_reasoning_steps(self, topic: str, sources: List[Dict]) -> List[str]:
+        return await self.summarizer.generate_reasoning_steps(topic, sources)
+
+    @property
+    def unique_sources(self) -> int:
+        return len(self._by_url)
+
+
+class BatchRunner:
+    """Runs many research requests on a shared, bounded pool of workers."""
+
+    def __init__(self, pipeline: ResearchPipeline, max_workers: int = 4):
+        self.pipeline = pipeline
+        self.max_workers = max_workers
+
+    async def run(self, requests: List[ResearchRequest]) -> AsyncIterator[Dict[str, Any]]:
+        """Yield one event per topic as it finishes, then aggregate stats."""
+        summarizer = SharedSourceSummarizer(self.pipeline.summarizer)
+        pipeline = ResearchPipeline(
+            self.pipeline.searcher,
+            summarizer,
+            self.pipeline.insight_generator,
+            report_cache=self.pipeline.report_cache,
+            report_store=self.pipeline.report_store,
+            search_cache=self.pipeline.search_cache,
+            fetcher=self.pipeline.fetcher
+        )
+
+        pending: asyncio.Queue = asyncio.Queue()
+        for index, request in enumerate(requests):
+            pending.put_nowait((index, request))
+        finished: asyncio.Queue = asyncio.Queue()
+
+        async def worker():
+            # Outbound calls made on behalf of batch topics yield to interactive requests
+            current_priority.set(BATCH)
+            while True:
+                try:
+                    index, request = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                started = time.perf_counter()
+                try:
+                    report = await pipeline.run(request)
+                    event = {'event': 'report', 'data': report.model_dump(mode='json')}
+                except Exception as e:
+                    logger.error(f"Batch research error for '{request.topic}': {str(e)}")
+                    event = {'event': 'error', 'detail': str(e)}
+                event.update(index=index, topic=request.topic, elapsed=time.perf_counter() - started)
+                finished.put_nowait(event)
+
+        started = time.perf_counter()
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.max_workers, len(requests)))]
+        succeeded = 0
+        try:
+            for _ in range(len(requests)):
+                event = await finished.get()
+                succeeded += event['event'] == 'report'
+                yield event
+        finally:
+            for task in workers:
+                task.cancel()
+
+        elapsed = time.perf_counter() - started
+        yield {
+            'event': 'stats',
+            'data': {
+                'topics': len(requests),
+                'succeeded': succeeded,
+                'failed': len(requests) - succeeded,
+                'elapsed': elapsed,
+                'topics_per_second': len(requests) / elapsed if elapsed else 0.0,
+                'unique_sources': summarizer.unique_sources,
+                'reused_summaries': summarizer.reused,
+                'workers': len(workers)
+            }
+        }
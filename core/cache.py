@@ -0,0 +1,336 @@
+"""
+Caching primitives shared by the research pipeline.
+
+TTLCache is a bounded in-process LRU with per-entry expiry; SQLiteCache is an
+optional on-disk tier so cached results survive restarts; TieredCache layers
+the two and promotes disk hits into memory. StaleWhileRevalidateCache keeps
+serving expired entries for a grace period while the caller refreshes them.
+"""
+
+import json
+import time
+import asyncio
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_topic(topic: str) -> str:
+    """Case-fold a topic and collapse runs of whitespace."""
+    return " ".join(topic.casefold().split())
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire after a fixed TTL."""
+
+    def __init__(self, max_entries: int = 128, ttl: Optional[float] = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+class SQLiteCache:
+    """On-disk cache tier storing JSON-serializable values in SQLite.
+
+    Reads never write: access times of hits are buffered and written in one
+    batch before the next eviction, or once ``touch_batch`` of them pile up.
+    Writes keep a running row count, so the size bound is checked without a
+    table scan; expired rows are swept through an index on ``expires_at``
+    when the table is full or every ``sweep_interval`` seconds.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl: Optional[float] = 86400, table: str = "cache",
+                 touch_batch: int = 256, sweep_interval: float = 60):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.table = table
+        self.touch_batch = touch_batch
+        self.sweep_interval = sweep_interval
+        self._touched: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table}(accessed_at)")
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_expires ON {table}(expires_at)")
+        self._conn.commit()
+        (self._count,) = self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+        self._swept_at = time.monotonic()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                # Expired rows are deleted by the next eviction pass
+                self.misses += 1
+                return None
+
+            self._touched[key] = now
+            if len(self._touched) >= self.touch_batch:
+                self._flush_touched()
+                self._conn.commit()
+            self.hits += 1
+            return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            exists = self._conn.execute(f"SELECT 1 FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now)
+            )
+            self._count += exists is None
+            if self._count > self.max_entries or time.monotonic() - self._swept_at >= self.sweep_interval:
+                self._evict()
+            self._conn.commit()
+
+    def _flush_touched(self):
+        """Write buffered access times of cache hits."""
+        if self._touched:
+            self._conn.executemany(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _evict(self):
+        """Drop expired rows, then the least recently used rows above the size bound."""
+        self._flush_touched()
+        self._swept_at = time.monotonic()
+        expired = self._conn.execute(
+            f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+        )
+        self._count -= expired.rowcount
+        overflow = self._count - self.max_entries
+        if overflow > 0:
+            evicted = self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY accessed_at LIMIT ?)", (overflow,)
+            )
+            self._count -= evicted.rowcount
+            self.evictions += evicted.rowcount
+
+    def delete(self, key: str):
+        with self._lock:
+            deleted = self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._count -= deleted.rowcount
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._count = 0
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        return count
+
+    def close(self):
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+        self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            # The running count, so scrapes never scan the table
+            'size': self._count,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+class TieredCache:
+    """Memory cache backed by an optional disk tier; disk hits are promoted to memory.
+
+    Disk writes and deletes run in order on a single background thread, so
+    callers on the event loop never wait for SQLite; until a write lands the
+    value is served from memory. Async callers should read with ``aget``,
+    which does disk lookups in a worker thread too.
+    """
+
+    def __init__(self, memory: TTLCache, disk: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.disk = disk
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-write") if disk is not None else None
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """Like ``get``, but a memory miss reads the disk tier off the event loop."""
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = await asyncio.to_thread(self.disk.get, key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self._writer.submit(self._write, self.disk.set, key, value)
+
+    def delete(self, key: str):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self._writer.submit(self._write, self.disk.delete, key)
+
+    @staticmethod
+    def _write(operation, *args):
+        try:
+            operation(*args)
+        except sqlite3.Error as e:
+            logger.error(f"Disk cache write failed: {str(e)}")
+
+    def flush(self):
+        """Wait for queued disk writes to land."""
+        if self._writer is not None:
+            self._writer.submit(lambda: None).result()
+
+    def close(self):
+        if self.disk is not None:
+            self._writer.shutdown(wait=True)
+            self.disk.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'memory': self.memory.stats(),
+            'disk': self.disk.stats() if self.disk is not None else None
+        }
+
+
+class StaleWhileRevalidateCache:
+    """Bounded LRU whose entries stay servable, flagged stale, for a grace period after their TTL.
+
+    Empty values are cached as negative entries with their own short TTL and
+    are never served stale.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 600, stale_ttl: float = 3600, negative_ttl: float = 60):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self._entries = TTLCache(max_entries=max_entries, ttl=None)
+        self.stale_hits = 0
+        self.negative_hits = 0
+
+    def get(self, key: str) -> Tuple[Optional[Any], bool]:
+        """Return ``(value, stale)``; ``value`` is None on a miss."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+
+        value, fresh_until = entry
+        stale = fresh_until <= time.monotonic()
+        if stale:
+            self.stale_hits += 1
+        if not value:
+            self.negative_hits += 1
+        return value, stale
+
+    def set(self, key: str, value: Any):
+        if value:
+            fresh_for, keep_for = self.ttl, self.ttl + self.stale_ttl
+        else:
+            fresh_for = keep_for = self.negative_ttl
+        self._entries.set(key, (value, time.monotonic() + fresh_for), ttl=keep_for)
+
+    def delete(self, key: str):
+        self._entries.delete(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'memory': {
+                **self._entries.stats(),
+                'stale_hits': self.stale_hits,
+                'negative_hits': self.negative_hits
+            }
+        }
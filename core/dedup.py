@@ -0,0 +1,128 @@
+"""
+Source deduplication ahead of summarization.
+
+Mirrored and syndicated articles reach us under different URLs, and each
+copy would otherwise cost its own LLM summarization call. Sources are
+collapsed when their canonical URLs match or when the SimHash fingerprints
+of their content are within a small Hamming distance of each other.
+"""
+
+import re
+import hashlib
+import logging
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = frozenset({'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'ref', 'ref_src', 'igshid'})
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+_WORD = re.compile(r'\w+')
+
+
+def canonicalize_url(url: str) -> str:
+    """Reduce a URL to the form shared by its trivial variants.
+
+    Scheme and host are lowercased, ``www.``, default ports, fragments,
+    trailing slashes and tracking parameters are dropped, the remaining
+    query parameters are sorted and http/https are treated alike.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url.strip()
+
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    if scheme in DEFAULT_PORTS:
+        scheme = 'https'
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip('/') or ''
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """64-bit SimHash over word shingles; similar texts get nearby fingerprints."""
+    words = _WORD.findall(text.lower())
+    if len(words) < shingle_size:
+        shingles = [' '.join(words)] if words else []
+    else:
+        shingles = [' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+
+    counts = [0] * 64
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'big')
+        for bit in range(64):
+            counts[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, count in enumerate(counts) if count > 0)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class SourceDeduplicator:
+    """Drops sources whose URL or content duplicates one already kept."""
+
+    def __init__(self, max_distance: int = 3, min_words: int = 20, shingle_size: int = 3):
+        self.max_distance = max_distance
+        # Very short snippets share too few shingles for a meaningful fingerprint
+        self.min_words = min_words
+        self.shingle_size = shingle_size
+        self.duplicates_dropped = 0
+
+    def deduplicate(self, sources: List[Dict[str, Any]], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Keep the first of each group of duplicates, in order, up to ``limit`` sources.
+
+        Sources are expected best first, so the most credible copy survives and
+        the slots freed by dropped copies go to the next distinct candidates.
+        """
+        kept: List[Dict[str, Any]] = []
+        seen_urls = set()
+        fingerprints: List[int] = []
+
+        for source in sources:
+            if limit is not None and len(kept) >= limit:
+                break
+
+            url = canonicalize_url(source.get('url', '') or '')
+            if url and url in seen_urls:
+                self._dropped(source, 'URL')
+                continue
+
+            content = source.get('content', '') or ''
+            fingerprint = None
+            if len(_WORD.findall(content)) >= self.min_words:
+                fingerprint = simhash(content, self.shingle_size)
+                if any(hamming_distance(fingerprint, other) <= self.max_distance for other in fingerprints):
+                    self._dropped(source, 'content')
+                    continue
+
+            if url:
+                seen_urls.add(url)
+            if fingerprint is not None:
+                fingerprints.append(fingerprint)
+            kept.append(source)
+
+        return kept
+
+    def _dropped(self, source: Dict[str, Any], reason: str):
+        self.duplicates_dropped += 1
+        logger.info(f"Skipping duplicate source ({reason}): {source.get('url', '')}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'max_distance': self.max_distance,
+            'duplicates_dropped': self.duplicates_dropped
+        }
@@ -0,0 +1,266 @@
+"""
+Federated search across several providers.
+
+Providers are queried concurrently and their results merged, re-ranked by
+credibility and deduplicated. A call that runs past its provider's recent
+latency percentile triggers a hedged request to the next spare provider,
+and a circuit breaker per provider stops sending traffic to one that keeps
+failing until it has had time to recover.
+"""
+
+import os
+import time
+import json
+import asyncio
+import logging
+from collections import deque
+from typing import List, Dict, Any, Optional
+
+from core.credibility import CredibilityScorer
+from core.dedup import SourceDeduplicator
+from core.metrics import percentile, SEARCH_PROVIDER_CALLS
+from core.search import SearchProvider, TavilyProvider, StubProvider, FallbackSearcher, FallbackSources, TAVILY_AVAILABLE
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open trial after a cool-down."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; in half-open state only one trial call is let through."""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+        return True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """Forget an abandoned trial call without counting it either way."""
+        self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {'state': self.state, 'failures': self.failures}
+
+
+class FederatedSearcher:
+    """Searches several providers at once and merges their results.
+
+    ``fanout`` providers are queried up front, in the order given. The search
+    completes once ``fanout`` of them have answered; a provider that fails is
+    replaced by the next spare one, and a provider still running after its
+    hedge delay (the ``hedge_percentile`` of its recent latencies, or
+    ``hedge_after`` until enough samples exist) gets a spare started
+    alongside it. Whichever calls are still pending at that point are
+    cancelled.
+
+    Failover and hedging both need spares, i.e. ``fanout`` below the number
+    of providers; by default one provider is held back as the spare.
+    """
+
+    def __init__(self, providers: List[SearchProvider], fanout: Optional[int] = None, timeout: float = 30.0,
+                 hedge_percentile: float = 95, hedge_after: float = 1.0, min_samples: int = 20,
+                 failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 scorer: Optional[CredibilityScorer] = None, deduplicator: Optional[SourceDeduplicator] = None):
+        if not providers:
+            raise ValueError("FederatedSearcher needs at least one provider")
+        self.providers = providers
+        if fanout is None:
+            fanout = len(providers) - 1
+        self.fanout = max(1, min(fanout, len(providers)))
+        if self.fanout == len(providers) > 1:
+            logger.warning("Search fanout covers every provider; no spares are left for failover or hedging")
+        self.timeout = timeout
+        self.hedge_percentile = hedge_percentile
+        self.hedge_after = hedge_after
+        self.min_samples = min_samples
+        self.breakers = {p.name: CircuitBreaker(failure_threshold, reset_timeout) for p in providers}
+        self.latencies = {p.name: deque(maxlen=500) for p in providers}
+        self.hedges = 0
+        self.scorer = scorer or CredibilityScorer(weights=json.loads(os.getenv("CREDIBILITY_WEIGHTS", "{}")))
+        self.deduplicator = deduplicator or SourceDeduplicator(max_distance=int(os.getenv("DEDUP_MAX_DISTANCE", "3")))
+        self.fallback = FallbackSearcher()
+
+    def hedge_delay(self, provider: SearchProvider) -> float:
+        samples = self.latencies[provider.name]
+        if len(samples) < self.min_samples:
+            return self.hedge_after
+        return percentile(list(samples), self.hedge_percentile)
+
+    @property
+    def cache_scope(self) -> str:
+        return f"federated{self.fanout}:" + '|'.join(p.cache_scope for p in self.providers)
+
+    async def search_sources(self, topic: str, max_results: int = 3) -> List[Dict[str, Any]]:
+        """Search all providers for credible sources on the given topic."""
+        # Over-fetch so filtering and deduplication can still fill max_results
+        results = await self._federate(topic, max_results * 2)
+        if results is None:
+            logger.warning("No search provider answered, using mock sources")
+            return FallbackSources(await self.fallback.search_sources(topic, max_results))
+
+        credible_sources = self.scorer.filter_credible(results, threshold=0.6)
+        return self.deduplicator.deduplicate(credible_sources, limit=max_results)
+
+    async def _federate(self, query: str, max_results: int) -> Optional[List[Dict[str, Any]]]:
+        """Merged results of the providers that answered, or None if none did.
+
+        An empty list means providers answered with no results, which is a
+        real (and cacheable) outcome rather than a failure.
+        """
+        loop = asyncio.get_running_loop()
+        spares = deque(self.providers)
+        running: Dict[asyncio.Task, tuple] = {}
+        hedged = set()
+        answers: Dict[str, List[Dict[str, Any]]] = {}
+
+        def launch_spare() -> bool:
+            # Breakers are consulted only when a provider is actually called,
+            # so an unused spare never holds a half-open trial slot
+            while spares:
+                provider = spares.popleft()
+                if self.breakers[provider.name].allow():
+                    task = asyncio.create_task(self._call(provider, query, max_results))
+                    running[task] = (provider, loop.time())
+                    return True
+            return False
+
+        while len(running) < self.fanout and launch_spare():
+            pass
+
+        try:
+            while running and len(answers) < self.fanout:
+                now = loop.time()
+                next_hedge = None
+                for task, (provider, started) in list(running.items()):
+                    if task in hedged or not spares:
+                        continue
+                    due = started + self.hedge_delay(provider)
+                    if due <= now:
+                        # Hedge: start a spare alongside the slow call, first answers win
+                        hedged.add(task)
+                        if launch_spare():
+                            self.hedges += 1
+                            logger.info(f"Hedging slow {provider.name} search")
+                    elif next_hedge is None or due < next_hedge:
+                        next_hedge = due
+
+                done, _ = await asyncio.wait(
+                    running, timeout=None if next_hedge is None else next_hedge - now,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    provider, _ = running.pop(task)
+                    sources = task.result()
+                    if sources is None:
+                        launch_spare()
+                        continue
+                    answers[provider.name] = sources
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        if not answers:
+            return None
+        # Merge in provider order so equally credible results rank deterministically
+        return [source for p in self.providers for source in answers.get(p.name, [])]
+
+    async def _call(self, provider: SearchProvider, query: str, max_results: int) -> Optional[List[Dict[str, Any]]]:
+        """Query one provider; returns None on failure so the caller can fail over."""
+        breaker = self.breakers[provider.name]
+        started = time.perf_counter()
+        try:
+            sources = await asyncio.wait_for(provider.search(query, max_results), timeout=self.timeout)
+        except asyncio.CancelledError:
+            # Lost a hedge race; says nothing about the provider's health
+            breaker.release()
+            SEARCH_PROVIDER_CALLS.inc(provider=provider.name, outcome='cancelled')
+            raise
+        except asyncio.TimeoutError:
+            logger.error(f"{provider.name} search timed out after {self.timeout}s")
+            breaker.record_failure()
+            SEARCH_PROVIDER_CALLS.inc(provider=provider.name, outcome='timeout')
+            return None
+        except Exception as e:
+            logger.error(f"{provider.name} search error: {str(e)}")
+            breaker.record_failure()
+            SEARCH_PROVIDER_CALLS.inc(provider=provider.name, outcome='error')
+            return None
+
+        breaker.record_success()
+        self.latencies[provider.name].append(time.perf_counter() - started)
+        SEARCH_PROVIDER_CALLS.inc(provider=provider.name, outcome='success')
+        return sources
+
+    def close(self):
+        for provider in self.providers:
+            provider.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'fanout': self.fanout,
+            'hedges': self.hedges,
+            'duplicates_dropped': self.deduplicator.duplicates_dropped,
+            'providers': {
+                p.name: {
+                    **self.breakers[p.name].stats(),
+                    'hedge_delay': self.hedge_delay(p),
+                    'p50_latency': percentile(list(self.latencies[p.name]), 50),
+                    'samples': len(self.latencies[p.name])
+                }
+                for p in self.providers
+            }
+        }
+
+
+def build_providers(names: List[str], allow_stubs: bool = False) -> List[SearchProvider]:
+    """Providers for a SEARCH_PROVIDERS list: "tavily" and any number of "stub*" names.
+
+    Stub providers return synthetic results, so they are only built when
+    ``allow_stubs`` is set (demo mode or local testing).
+    """
+    providers: List[SearchProvider] = []
+    for name in names:
+        if name == 'tavily':
+            if not TAVILY_AVAILABLE or not os.getenv("TAVILY_API_KEY"):
+                logger.warning("Skipping tavily search provider: client or TAVILY_API_KEY not available")
+                continue
+            providers.append(TavilyProvider())
+        elif name.startswith('stub'):
+            if not allow_stubs:
+                logger.warning(f"Skipping {name} search provider: stubs need demo mode or SEARCH_ALLOW_STUBS=1")
+                continue
+            providers.append(StubProvider(name))
+        else:
+            logger.warning(f"Unknown search provider: {name}")
+    return providers
@@ -0,0 +1,215 @@
+"""
+Optional full-text fetching for search results.
+
+Search APIs return short snippets. ContentFetcher downloads each source page
+over a pooled aiohttp session, feeds the body to an incremental HTML text
+extractor chunk by chunk and stops reading as soon as enough main text has
+been captured. Downloads are bounded in concurrency, bytes and time, and
+extracted text is cached by URL: fresh entries are served as they are, and
+older ones are revalidated with the page's ETag.
+"""
+
+import re
+import time
+import codecs
+import asyncio
+import logging
+from html.parser import HTMLParser
+from typing import Dict, Any, List, Optional
+
+from core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Containers whose text is never article content
+SKIP_TAGS = frozenset({'script', 'style', 'noscript', 'template', 'svg', 'iframe', 'nav', 'header', 'footer', 'aside', 'form'})
+# Elements whose text makes up the main content of a page
+BLOCK_TAGS = frozenset({'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'blockquote', 'pre', 'dd', 'dt', 'figcaption', 'td'})
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+class TextExtractor(HTMLParser):
+    """Incremental main-text extractor; feed it chunks and stop once ``done``."""
+
+    def __init__(self, max_chars: int = 8000):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.paragraphs: List[str] = []
+        self.loose: List[str] = []
+        self.chars = 0
+        self._loose_chars = 0
+        self._skip_depth = 0
+        self._block_depth = 0
+        self._buffer: List[str] = []
+
+    @property
+    def done(self) -> bool:
+        # A page with no paragraph markup so far is done once its visible text fills the cap
+        return self.chars >= self.max_chars or (not self.paragraphs and self._loose_chars >= self.max_chars)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._flush()
+            self._block_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self._flush()
+            self._block_depth = max(0, self._block_depth - 1)
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._block_depth:
+            self._buffer.append(data)
+        elif data.strip() and self._loose_chars < self.max_chars:
+            # Pages without paragraph markup fall back to all visible text
+            self.loose.append(data)
+            self._loose_chars += len(data)
+
+    def _flush(self):
+        paragraph = _WHITESPACE.sub(' ', ''.join(self._buffer)).strip()
+        self._buffer = []
+        if paragraph and not self.done:
+            self.paragraphs.append(paragraph)
+            self.chars += len(paragraph) + 1
+
+    @property
+    def text(self) -> str:
+        self._flush()
+        if self.paragraphs:
+            text = '\n'.join(self.paragraphs)
+        else:
+            text = _WHITESPACE.sub(' ', ' '.join(self.loose)).strip()
+        return text[:self.max_chars]
+
+
+class ContentFetcher:
+    """Downloads source pages and replaces search snippets with their extracted text."""
+
+    def __init__(self, max_concurrency: int = 8, timeout: float = 10.0, max_bytes: int = 2_000_000,
+                 max_chars: int = 8000, chunk_size: int = 16384, cache: Optional[TTLCache] = None,
+                 user_agent: str = "InsightSynth/1.0", fresh_for: float = 3600):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.chunk_size = chunk_size
+        self.cache = cache if cache is not None else TTLCache(max_entries=512, ttl=86400)
+        self.user_agent = user_agent
+        # Cached texts younger than this are served without a conditional request
+        self.fresh_for = fresh_for
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session = None
+        self.fetched = 0
+        self.not_modified = 0
+        self.failures = 0
+
+    def _get_session(self):
+        # Created lazily so the session and its connection pool belong to the running loop
+        if self._session is None or self._session.closed:
+            import aiohttp
+
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'User-Agent': self.user_agent}
+            )
+        return self._session
+
+    async def enrich(self, sources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Copies of ``sources`` whose content is the page text, where it beats the snippet."""
+        texts = await asyncio.gather(*(self.fetch_text(source.get('url', '')) for source in sources))
+        enriched = []
+        for source, text in zip(sources, texts):
+            if text and len(text) > len(source.get('content', '') or ''):
+                source = {**source, 'content': text, 'snippet': source.get('content', '')}
+            enriched.append(source)
+        return enriched
+
+    async def fetch_text(self, url: str) -> Optional[str]:
+        """Extracted main text of a page, or None if it could not be fetched."""
+        if not url.startswith(('http://', 'https://')):
+            return None
+
+        cached = self.cache.get(url)
+        if cached is not None and (not cached['etag'] or time.monotonic() - cached['fetched_at'] < self.fresh_for):
+            return cached['text']
+
+        headers = {'If-None-Match': cached['etag']} if cached is not None else {}
+        try:
+            async with self._semaphore:
+                return await asyncio.wait_for(self._download(url, headers, cached), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.failures += 1
+            logger.warning(f"Fetching {url} timed out after {self.timeout}s")
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"Fetching {url} failed: {str(e)}")
+        return cached['text'] if cached is not None else None
+
+    async def _download(self, url: str, headers: Dict[str, str], cached: Optional[Dict[str, Any]]) -> Optional[str]:
+        async with self._get_session().get(url, headers=headers) as response:
+            if response.status == 304 and cached is not None:
+                self.not_modified += 1
+                self.cache.set(url, {**cached, 'fetched_at': time.monotonic()})
+                return cached['text']
+            response.raise_for_status()
+
+            content_type = response.content_type or ''
+            if content_type not in ('text/html', 'application/xhtml+xml', 'text/plain'):
+                logger.info(f"Skipping {url}: unsupported content type {content_type}")
+                return None
+
+            text = await self._extract(response, plain=content_type == 'text/plain')
+
+        self.fetched += 1
+        self.cache.set(url, {'etag': response.headers.get('ETag', ''), 'text': text, 'fetched_at': time.monotonic()})
+        return text
+
+    async def _extract(self, response, plain: bool) -> str:
+        """Stream the body through the extractor, stopping at the text or byte cap."""
+        try:
+            decoder = codecs.getincrementaldecoder(response.charset or 'utf-8')(errors='replace')
+        except LookupError:
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        extractor = TextExtractor(self.max_chars)
+        parts: List[str] = []
+        received = chars = 0
+
+        async for chunk in response.content.iter_chunked(self.chunk_size):
+            received += len(chunk)
+            decoded = decoder.decode(chunk)
+            if plain:
+                parts.append(decoded)
+                chars += len(decoded)
+                if chars >= self.max_chars:
+                    break
+            else:
+                extractor.feed(decoded)
+                if extractor.done:
+                    break
+            if received >= self.max_bytes:
+                logger.info(f"Stopped reading {response.url} at the {self.max_bytes} byte cap")
+                break
+
+        if plain:
+            return _WHITESPACE.sub(' ', ''.join(parts)).strip()[:self.max_chars]
+        return extractor.text
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'fetched': self.fetched,
+            'not_modified': self.not_modified,
+            'failures': self.failures,
+            'cache': self.cache.stats()
+        }
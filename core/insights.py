@@ -1,20 +1,20 @@
 import os
-from typing import List, Dict, Any
+import math
+import asyncio
+from typing import List, Dict, Any, Optional
 # Removed LangChain dependencies for demo mode compatibility
 import logging
 
+from core.scheduler import scheduler, estimate_tokens
+from core.parsing import parse_insights, INSIGHT_SECTIONS, SUMMARY_FIELDS
+from core.attribution import AttributionIndex
+from core.prompts import PromptBuilder
+
 logger = logging.getLogger(__name__)
 
-class InsightGenerator:
-    def __init__(self):
-        # Placeholder for real AI implementation
-        # In demo mode, this won't be used
-        pass
-    
-    async def generate_cross_insights(self, topic: str, summaries: List[Dict]) -> Dict[str, Any]:
-        """Generate cross-source insights, contradictions, and trends."""
-        
-        system_prompt = """You are an expert research synthesizer. Your task is to analyze multiple research summaries and extract meaningful cross-insights.
+MAP_REDUCE_MODES = ('auto', 'always', 'never')
+
+SYSTEM_PROMPT = """You are an expert research synthesizer. Your task is to analyze multiple research summaries and extract meaningful cross-insights.
 
 Generate:
 1. 3-5 unique actionable insights that emerge from comparing sources
@@ -24,8 +24,163 @@ Generate:
 
 Be specific, actionable, and evidence-based. Avoid generic statements."""
 
+
+def _similarity(a: Dict[str, float], b: Dict[str, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(token, 0.0) for token, weight in a.items())
+
+
+def cluster_summaries(summaries: List[Dict], count: int) -> List[List[int]]:
+    """Split summaries into at most ``count`` balanced groups of similar content.
+
+    Returns summary indexes per group, each group in source order.
+    """
+    total = len(summaries)
+    count = max(1, min(count, total))
+    if count == 1:
+        return [list(range(total))]
+
+    vectors = AttributionIndex.for_summaries(summaries).vectors
+    # Farthest-point seeds: start from the first summary, then keep taking the one least like any seed
+    seeds = [0]
+    closest = [_similarity(vector, vectors[0]) for vector in vectors]
+    while len(seeds) < count:
+        seed = min((i for i in range(total) if i not in seeds), key=lambda i: (closest[i], i))
+        seeds.append(seed)
+        closest = [max(score, _similarity(vectors[i], vectors[seed])) for i, score in enumerate(closest)]
+
+    # Closest pairs are placed first, so the capacity cap only moves the ambiguous summaries
+    capacity = math.ceil(total / count)
+    groups: List[List[int]] = [[] for _ in seeds]
+    assigned = set()
+    pairs = sorted(((_similarity(vectors[i], vectors[seed]), -i, group)
+                    for i in range(total) for group, seed in enumerate(seeds)), reverse=True)
+    for _, i, group in pairs:
+        if -i in assigned or len(groups[group]) >= capacity:
+            continue
+        groups[group].append(-i)
+        assigned.add(-i)
+    return [sorted(group) for group in groups if group]
+
+
+class InsightGenerator:
+    def __init__(self, map_reduce: str = 'auto', fanout: int = 0, max_prompt_tokens: int = 6000,
+                 prompt_builder: Optional[PromptBuilder] = None):
+        # Placeholder for real AI implementation
+        # In demo mode, this won't be used
+        if map_reduce not in MAP_REDUCE_MODES:
+            raise ValueError(f"map_reduce must be one of {', '.join(MAP_REDUCE_MODES)}, got {map_reduce!r}")
+        self.map_reduce = map_reduce
+        self.fanout = fanout
+        self.max_prompt_tokens = max_prompt_tokens
+        self.prompt_builder = prompt_builder or PromptBuilder(summaries_tokens=max_prompt_tokens)
+    
+    async def generate_cross_insights(self, topic: str, summaries: List[Dict]) -> Dict[str, Any]:
+        """Generate cross-source insights, contradictions, and trends.
+        
+        Summaries are first compressed to share the prompt budget; source sets too
+        large for that are analyzed map-reduce style (see ``_map_reduce``).
+        """
+        summaries_text = self._format_summaries_for_analysis(summaries, topic)
+        clusters = self._cluster_count(estimate_tokens(SYSTEM_PROMPT + summaries_text), len(summaries))
+        if clusters > 1:
+            return await self._map_reduce(topic, summaries, clusters)
+        return await self._analyze(topic, summaries, summaries_text)
+    
+    def _cluster_count(self, prompt_tokens: int, sources: int) -> int:
+        """Partial analyses to fan out to; 1 means a single prompt."""
+        if sources < 4 or self.map_reduce == 'never':
+            return 1
+        if self.map_reduce == 'auto' and prompt_tokens <= self.max_prompt_tokens:
+            return 1
+        # Keep at least two sources per cluster so partial insights still compare sources
+        width = self.fanout or math.ceil(prompt_tokens / self.max_prompt_tokens)
+        return max(2, min(width, sources // 2))
+    
+    async def _map_reduce(self, topic: str, summaries: List[Dict], clusters: int) -> Dict[str, Any]:
+        """Analyze clusters of similar summaries concurrently, then reduce the partial insights."""
+        groups = [[summaries[i] for i in group] for group in cluster_summaries(summaries, clusters)]
+        logger.info(f"Generating insights over {len(summaries)} sources in {len(groups)} clusters")
+        partials = await asyncio.gather(*(self._analyze(topic, group) for group in groups))
+        return await self._reduce(topic, summaries, partials)
+    
+    async def _reduce(self, topic: str, summaries: List[Dict], partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine per-cluster insights into the final insights over all sources."""
+        numbers = {summary.get('url'): i for i, summary in enumerate(summaries, 1)}
+        sources_text = '\n'.join(f"Source {i}: {summary.get('title', 'N/A')}" for i, summary in enumerate(summaries, 1))
+        partial_text = []
+        for cluster, partial in enumerate(partials, 1):
+            partial_text.append(f"Cluster {cluster}:")
+            for insight in partial.get('cross_insights', []):
+                cited = ', '.join(str(numbers[url]) for url in insight['supporting_sources'] if url in numbers)
+                partial_text.append(f"- {insight['insight']} (Sources {cited or 'unknown'}, {insight['confidence_level']} confidence)")
+            for name in INSIGHT_SECTIONS[1:]:
+                partial_text.extend(f"- {name.replace('_', ' ').title()}: {item}" for item in partial.get(name, []))
+        
+        human_prompt = f"""
+Topic: {topic}
+
+Sources:
+{sources_text}
+
+Partial analyses of clusters of these sources:
+{chr(10).join(partial_text)}
+
+Merge the partial analyses into one analysis of all sources. Combine overlapping points, keep contradictions between clusters, and provide:
+
+CROSS-INSIGHTS (3-5 actionable insights):
+- [Insight 1 with supporting evidence]
+- etc.
+
+CONTRADICTIONS:
+- [Any conflicting findings between sources]
+
+EMERGING TRENDS:
+- [Patterns or trends identified across sources]
+
+KEY TAKEAWAYS:
+- [3-5 practical, actionable takeaways]
+
+For each insight, specify which sources support it by number and assign a confidence level (High/Medium/Low).
+"""
+        try:
+            response = await self._complete(SYSTEM_PROMPT, human_prompt)
+        except Exception as e:
+            logger.error(f"Insight reduction error: {str(e)}")
+            response = None
+        if response:
+            return self._parse_insights_response(response, summaries)
+        return self._merge_partials(partials)
+    
+    def _merge_partials(self, partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Union of partial insights: repeated insights merge their sources, repeated items are dropped."""
+        merged: Dict[str, Any] = {name: [] for name in INSIGHT_SECTIONS}
+        insights: Dict[str, Dict[str, Any]] = {}
+        seen = set()
+        for partial in partials:
+            for insight in partial.get('cross_insights', []):
+                existing = insights.setdefault(insight['insight'].strip().lower(), {**insight, 'supporting_sources': []})
+                existing['supporting_sources'].extend(
+                    url for url in insight['supporting_sources'] if url not in existing['supporting_sources'])
+            for name in INSIGHT_SECTIONS[1:]:
+                for item in partial.get(name, []):
+                    if (name, item.strip().lower()) not in seen:
+                        seen.add((name, item.strip().lower()))
+                        merged[name].append(item)
+        merged['cross_insights'] = list(insights.values())
+        return merged
+    
+    async def _complete(self, system_prompt: str, human_prompt: str) -> Optional[str]:
+        """Run one LLM call under the shared scheduler; None until a model is wired in."""
+        async with scheduler.slot('llm', tokens=estimate_tokens(system_prompt + human_prompt)):
+            # This is a placeholder - in demo mode, mock AI is used instead
+            return None
+    
+    async def _analyze(self, topic: str, summaries: List[Dict], summaries_text: Optional[str] = None) -> Dict[str, Any]:
+        """Single-prompt analysis of a set of summaries."""
         # Prepare summaries for analysis
-        summaries_text = self._format_summaries_for_analysis(summaries)
+        summaries_text = summaries_text or self._format_summaries_for_analysis(summaries, topic)
         
         human_prompt = f"""
 Topic: {topic}
@@ -53,6 +208,9 @@ For each insight, specify which sources support it and assign a confidence level
 """
 
         try:
+            response = await self._complete(SYSTEM_PROMPT, human_prompt)
+            if response:
+                return self._parse_insights_response(response, summaries)
             # Return fallback insights for demo mode
             return self._fallback_insights(summaries)
             
@@ -60,83 +218,57 @@ For each insight, specify which sources support it and assign a confidence level
             logger.error(f"Insight generation error: {str(e)}")
             return self._fallback_insights(summaries)
     
-    def _format_summaries_for_analysis(self, summaries: List[Dict]) -> str:
-        """Format summaries for LLM analysis."""
-        formatted = []
-        for i, summary in enumerate(summaries, 1):
-            formatted.append(f"""
-Source {i}: {summary.get('title', 'N/A')}
+    def _format_summaries_for_analysis(self, summaries: List[Dict], topic: str = '') -> str:
+        """Format summaries for LLM analysis, each compressed to its share of the prompt budget.
+        
+        The system prompt and the per-source framing are reserved first, so a
+        summary set that fits at the floor share also fits ``max_prompt_tokens``.
+        """
+        blank = dict.fromkeys(SUMMARY_FIELDS, '')
+        framing = '\n'.join(self._format_summary(i, {**summary, **blank}) for i, summary in enumerate(summaries, 1))
+        budget = self.prompt_builder.summary_budget(len(summaries), reserved=estimate_tokens(SYSTEM_PROMPT + framing))
+        return '\n'.join(
+            self._format_summary(i, self.prompt_builder.compress_summary(summary, topic, budget))
+            for i, summary in enumerate(summaries, 1)
+        )
+    
+    @staticmethod
+    def _format_summary(number: int, summary: Dict[str, Any]) -> str:
+        return f"""
+Source {number}: {summary.get('title', 'N/A')}
 URL: {summary.get('url', 'N/A')}
 Summary: {summary.get('summary', 'N/A')}
 Core Argument: {summary.get('core_argument', 'N/A')}
 Evidence: {summary.get('evidence_used', 'N/A')}
 Conclusion: {summary.get('conclusion', 'N/A')}
 Credibility: {summary.get('credibility_score', 0.5):.2f}
-""")
-        return '\n'.join(formatted)
+"""
     
     def _parse_insights_response(self, response: str, summaries: List[Dict]) -> Dict[str, Any]:
-        """Parse the LLM response into structured insights."""
-        sections = {
-            'cross_insights': [],
-            'contradictions': [],
-            'emerging_trends': [],
-            'key_takeaways': []
-        }
-        
-        current_section = None
-        lines = response.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Identify sections
-            if 'CROSS-INSIGHTS' in line.upper():
-                current_section = 'cross_insights'
-                continue
-            elif 'CONTRADICTIONS' in line.upper():
-                current_section = 'contradictions'
-                continue
-            elif 'EMERGING TRENDS' in line.upper():
-                current_section = 'emerging_trends'
-                continue
-            elif 'KEY TAKEAWAYS' in line.upper():
-                current_section = 'key_takeaways'
-                continue
-            
-            # Parse content
-            if current_section and line.startswith('-'):
-                content = line[1:].strip()
-                if content:
-                    if current_section == 'cross_insights':
-                        insight_data = self._parse_insight_line(content, summaries)
-                        sections[current_section].append(insight_data)
-                    else:
-                        sections[current_section].append(content)
-        
+        """Parse the LLM response (sectioned text or JSON mode) into insight dicts and string lists."""
+        index = AttributionIndex.for_summaries(summaries)
+        sections = parse_insights(response, summaries, lambda line, _: self._parse_insight_line(line, summaries, index))
+        # Stage results are streamed as JSON and cached, so they stay plain data like the fallbacks
+        sections['cross_insights'] = [insight.model_dump() for insight in sections['cross_insights']]
         return sections
     
-    def _parse_insight_line(self, line: str, summaries: List[Dict]) -> Dict[str, Any]:
-        """Parse a single insight line to extract confidence and supporting sources."""
-        # Simple parsing - in production, this could be more sophisticated
+    def _parse_insight_line(self, line: str, summaries: List[Dict],
+                            index: Optional[AttributionIndex] = None) -> Dict[str, Any]:
+        """Parse a single insight line to extract confidence and supporting sources.
+        
+        Pass the response's AttributionIndex when parsing many lines to skip the index cache lookup.
+        """
+        lowered = line.lower()
         confidence = "Medium"  # Default
-        if "high confidence" in line.lower() or "strongly" in line.lower():
+        if "high confidence" in lowered or "strongly" in lowered:
             confidence = "High"
-        elif "low confidence" in line.lower() or "uncertain" in line.lower():
+        elif "low confidence" in lowered or "uncertain" in lowered:
             confidence = "Low"
         
-        # Extract supporting sources (simplified)
-        supporting_sources = []
-        for i, summary in enumerate(summaries, 1):
-            if f"source {i}" in line.lower() or summary.get('title', '').lower()[:20] in line.lower():
-                supporting_sources.append(summary.get('url', f'Source {i}'))
-        
-        if not supporting_sources:
-            supporting_sources = [s.get('url', 'N/A') for s in summaries[:2]]  # Default to first 2
-        
+        index = index or AttributionIndex.for_summaries(summaries)
         return {
             'insight': line,
-            'supporting_sources': supporting_sources,
+            'supporting_sources': index.attribute(lowered),
             'confidence_level': confidence
         }
     
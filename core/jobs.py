@@ -0,0 +1,162 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+import logging
+from collections import deque
+
+from core.pipeline import ResearchPipeline, NoSourcesError
+from core.metrics import current_trace_id
+from models.schemas import ResearchRequest
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFullError(Exception):
+    """Raised when the job queue is at capacity."""
+
+
+class Job:
+    """State of a single background research run."""
+
+    def __init__(self, request: ResearchRequest, trace_id: str = '-'):
+        self.job_id = uuid.uuid4().hex
+        self.request = request
+        # Workers are shared, so each job carries the trace id of the request that submitted it
+        self.trace_id = trace_id
+        self.status = 'queued'
+        self.created_at = datetime.now()
+        self.updated_at = self.created_at
+        self.finished_at: Optional[float] = None
+        self.partial: Dict[str, Any] = {}
+        self.report: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+
+    def _touch(self, status: Optional[str] = None):
+        if status:
+            self.status = status
+        self.updated_at = datetime.now()
+
+    def record(self, event: Dict[str, Any]):
+        """Fold a pipeline stream event into the job's partial results."""
+        if event['event'] == 'summary':
+            self.partial.setdefault('summaries', []).append(event['data'])
+        elif event['event'] == 'report':
+            self.report = event['data']
+        else:
+            self.partial[event['event']] = event['data']
+        self._touch()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.job_id,
+            'topic': self.request.topic,
+            'status': self.status,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'partial': self.partial,
+            'report': self.report,
+            'error': self.error
+        }
+
+
+class JobManager:
+    """Runs research jobs on a bounded worker pool and expires finished jobs after a TTL.
+
+    At most ``max_retained`` finished jobs are kept; beyond that the oldest
+    finished job is dropped early, so memory stays bounded however fast jobs
+    complete.
+    """
+
+    def __init__(self, pipeline: ResearchPipeline, max_workers: int = 2, max_queued: int = 100, ttl: float = 3600,
+                 max_retained: int = 1000):
+        self.pipeline = pipeline
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self.max_retained = max_retained
+        self.jobs: Dict[str, Job] = {}
+        # Finished job ids, oldest first
+        self._finished: deque = deque()
+        self.evicted = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def _ensure_started(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.max_workers)]
+        self._tasks.append(asyncio.create_task(self._cleanup_loop()))
+
+    def submit(self, request: ResearchRequest) -> Job:
+        self._ensure_started()
+        if self._queue.qsize() >= self.max_queued:
+            raise JobQueueFullError(f"Job queue is full ({self.max_queued} queued jobs)")
+
+        job = Job(request, trace_id=current_trace_id.get())
+        self.jobs[job.job_id] = job
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            token = current_trace_id.set(job.trace_id)
+            job._touch('running')
+            try:
+                async for event in self.pipeline.stream(job.request):
+                    job.record(event)
+                job._touch('completed')
+            except NoSourcesError as e:
+                job.error = str(e)
+                job._touch('failed')
+            except Exception as e:
+                logger.error(f"Research job {job.job_id} failed: {str(e)}")
+                job.error = f"Research failed: {str(e)}"
+                job._touch('failed')
+            finally:
+                job.finished_at = time.monotonic()
+                self._finished.append(job.job_id)
+                self._queue.task_done()
+                current_trace_id.reset(token)
+                while len(self._finished) > self.max_retained:
+                    self.jobs.pop(self._finished.popleft(), None)
+                    self.evicted += 1
+
+    def cleanup(self):
+        """Drop finished jobs whose results have outlived the TTL."""
+        cutoff = time.monotonic() - self.ttl
+        expired = 0
+        while self._finished and self.jobs[self._finished[0]].finished_at < cutoff:
+            del self.jobs[self._finished.popleft()]
+            expired += 1
+        return expired
+
+    async def _cleanup_loop(self):
+        while True:
+            await asyncio.sleep(min(self.ttl, 60))
+            self.cleanup()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            'workers': self.max_workers,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'max_queued': self.max_queued,
+            'max_retained': self.max_retained,
+            'evicted': self.evicted,
+            'jobs': counts
+        }
@@ -0,0 +1,120 @@
+"""
+Opt-in event-loop health monitor.
+
+A heartbeat coroutine measures how late the loop wakes it up (scheduling
+lag), while a watchdog thread checks that the heartbeat keeps advancing.
+When the loop is held longer than the threshold, the watchdog captures the
+loop thread's current stack, which points at the blocking callback or
+coroutine, and logs it.
+"""
+
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from core.metrics import percentile
+
+logger = logging.getLogger(__name__)
+
+
+class LoopMonitor:
+    """Samples event-loop lag and reports callbacks that block the loop."""
+
+    def __init__(self, interval: float = 0.05, threshold: float = 0.1, window: int = 2000, max_stalls: int = 50):
+        self.interval = interval
+        self.threshold = threshold
+        self.samples: deque = deque(maxlen=window)
+        self.stalls: deque = deque(maxlen=max_stalls)
+        self.stall_count = 0
+        self._beat = time.monotonic()
+        self._reported_beat: Optional[float] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        """Start monitoring the running event loop."""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        if not self.running:
+            return
+        self._stopping.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._watchdog.join(timeout=self.interval * 4)
+
+    async def _heartbeat(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._beat = time.monotonic()
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - expected))
+
+    def _watch(self):
+        while not self._stopping.wait(self.interval):
+            beat = self._beat
+            blocked_for = time.monotonic() - beat - self.interval
+            if blocked_for < self.threshold or self._reported_beat == beat:
+                continue
+
+            # Report each stall once, with the stack the loop thread is stuck in
+            self._reported_beat = beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = ''.join(traceback.format_stack(frame)) if frame is not None else ''
+            self.stall_count += 1
+            self.stalls.append({
+                'detected_at': datetime.now().isoformat(),
+                'blocked_seconds': blocked_for,
+                'stack': stack
+            })
+            logger.warning(f"Event loop blocked for at least {blocked_for * 1000:.0f} ms:\n{stack}")
+
+    def percentiles(self) -> Dict[str, float]:
+        samples = list(self.samples)
+        return {
+            'p50': percentile(samples, 50),
+            'p95': percentile(samples, 95),
+            'p99': percentile(samples, 99),
+            'max': max(samples) if samples else 0.0
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': self.running,
+            'interval': self.interval,
+            'threshold': self.threshold,
+            'lag': self.percentiles(),
+            'stalls': self.stall_count,
+            'recent_stalls': list(self.stalls)
+        }
+
+    def collect(self):
+        """Metrics collector yielding lag percentiles and the stall counter."""
+        if not self.running:
+            return
+        lag = self.percentiles()
+        yield ("insightsynth_event_loop_lag_seconds", "gauge", "Event-loop scheduling lag over the recent window",
+               [({"quantile": quantile}, lag[name]) for quantile, name in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99"), ("1", "max"))])
+        yield ("insightsynth_event_loop_stalls_total", "counter", "Times the event loop was blocked past the threshold",
+               [({}, self.stall_count)])
@@ -0,0 +1,220 @@
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+Counters, gauges and histograms are registered on a shared registry; callers
+can also register collectors that report point-in-time values (cache sizes,
+queue depths) when /metrics is scraped. Per-request trace ids are carried in
+a context variable and attached to log records by TraceIdFilter.
+"""
+
+import math
+import time
+import uuid
+import bisect
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar, Context, copy_context
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+current_trace_id: ContextVar[str] = ContextVar('current_trace_id', default='-')
+
+# A collected sample set: (name, type, help, [(labels, value), ...])
+Collected = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct * len(ordered) / 100) - 1))
+    return ordered[rank]
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def traced_context(trace_id: str) -> Context:
+    """A copy of the current context that runs under ``trace_id``, for background tasks."""
+    context = copy_context()
+    context.run(current_trace_id.set, trace_id)
+    return context
+
+
+class TraceIdFilter(logging.Filter):
+    """Attach the current trace id to every log record as ``trace_id``."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = current_trace_id.get()
+        return True
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    escaped = (
+        f'{key}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for key, value in labels.items()
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = 'untyped'
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(dict(zip(self.labelnames, key)))} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Gauge(Counter):
+    type = 'gauge'
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._listeners: List[Callable[[float, Dict[str, Any]], None]] = []
+
+    def add_listener(self, listener: Callable[[float, Dict[str, Any]], None]):
+        """Receive every raw observation (e.g. for exact percentiles in benchmarks)."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[float, Dict[str, Any]], None]):
+        self._listeners.remove(listener)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            # Per-bucket (non-cumulative) counts, then sum and count
+            series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+        for listener in self._listeners:
+            listener(value, labels)
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in self._series.items():
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and collectors and renders them in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Collected]]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Optional[Iterable[float]] = None) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets or DEFAULT_BUCKETS))
+
+    def add_collector(self, collector: Callable[[], Iterable[Collected]]):
+        """Register a callable producing point-in-time samples at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, metric_type, help, samples in collector():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram(
+    'insightsynth_stage_duration_seconds', 'Duration of research pipeline stages', ['stage']
+)
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    'insightsynth_http_request_duration_seconds', 'HTTP request latency until response headers', ['method', 'path', 'status']
+)
+HTTP_IN_FLIGHT = metrics.gauge(
+    'insightsynth_http_requests_in_flight', 'HTTP requests currently being handled'
+)
+RESEARCH_RESULTS = metrics.counter(
+    'insightsynth_research_total', 'Research runs by outcome', ['outcome']
+)
+SEARCH_PROVIDER_CALLS = metrics.counter(
+    'insightsynth_search_provider_calls_total', 'Federated search calls by provider and outcome', ['provider', 'outcome']
+)
+SUMMARIZED_SOURCES = metrics.counter(
+    'insightsynth_summarized_sources_total', 'Sources in summarization LLM calls, once per call: single, batched, or retry after an unparsable batch section', ['mode']
+)
@@ -3,15 +3,126 @@ Mock AI implementation for demo purposes when API keys are not available.
 This provides realistic-looking responses without requiring external API calls.
 """
 
+import os
+import json
+import math
 import asyncio
 import random
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
+from core.summarizer import summary_cache_key, get_cached_summary
+from core.scheduler import scheduler, estimate_tokens
+
+# Default simulated latency range (seconds) for each mock operation
+DEFAULT_LATENCIES = {
+    'summarize_source': (1.0, 3.0),
+    'reasoning': (1.0, 1.0),
+    'insights': (2.0, 4.0),
+}
+
+class MockAIError(Exception):
+    """Failure injected by the mock latency model."""
+
+class LatencyModel:
+    """Configurable latency and failure model for the mock AI components.
+    
+    Distributions:
+    - ``uniform``: uniform over each operation's (low, high) range (the default)
+    - ``fixed``: always the midpoint of the range
+    - ``lognormal``: median at the midpoint of the range, spread set by ``sigma``
+    - ``replay``: latencies drawn from a JSON trace of
+      ``{"operation": [seconds, ...]}``; unseeded, they are replayed in call
+      order (cycled when exhausted), seeded, each call picks its trace entry
+      with its per-key random source like the other distributions
+    
+    With a seed, every draw is derived from (seed, operation, key) so a given
+    source or topic always gets the same latency and response regardless of
+    how concurrent requests interleave.
+    """
+    
+    DISTRIBUTIONS = ('uniform', 'fixed', 'lognormal', 'replay')
+    
+    def __init__(self, distribution: str = 'uniform', seed: Optional[int] = None, scale: float = 1.0,
+                 sigma: float = 0.5, trace: Optional[Dict[str, List[float]]] = None,
+                 failure_rate: float = 0.0, timeout_rate: float = 0.0, timeout_seconds: float = 30.0,
+                 latencies: Optional[Dict[str, Tuple[float, float]]] = None):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{distribution}', expected one of {self.DISTRIBUTIONS}")
+        if distribution == 'replay' and not trace:
+            raise ValueError("The replay distribution needs a latency trace")
+        
+        self.distribution = distribution
+        self.seed = seed
+        self.scale = scale
+        self.sigma = sigma
+        self.trace = trace or {}
+        self.failure_rate = failure_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_seconds = timeout_seconds
+        self.latencies = {**DEFAULT_LATENCIES, **(latencies or {})}
+        self._replay_positions: Dict[str, int] = {}
+    
+    @classmethod
+    def from_env(cls) -> "LatencyModel":
+        trace = None
+        if os.getenv("MOCK_LATENCY_TRACE"):
+            with open(os.getenv("MOCK_LATENCY_TRACE")) as f:
+                trace = json.load(f)
+        seed = os.getenv("MOCK_LATENCY_SEED")
+        return cls(
+            distribution=os.getenv("MOCK_LATENCY_DISTRIBUTION", "replay" if trace else "uniform"),
+            seed=int(seed) if seed else None,
+            scale=float(os.getenv("MOCK_LATENCY_SCALE", "1.0")),
+            sigma=float(os.getenv("MOCK_LATENCY_SIGMA", "0.5")),
+            trace=trace,
+            failure_rate=float(os.getenv("MOCK_FAILURE_RATE", "0")),
+            timeout_rate=float(os.getenv("MOCK_TIMEOUT_RATE", "0")),
+            timeout_seconds=float(os.getenv("MOCK_TIMEOUT_SECONDS", "30"))
+        )
+    
+    def rng(self, operation: str, key: str = '') -> random.Random:
+        """Random source for one call; deterministic per (seed, operation, key) when seeded."""
+        if self.seed is None:
+            return random.Random()
+        return random.Random(f"{self.seed}:{operation}:{key}")
+    
+    def sample(self, operation: str, rng: random.Random) -> float:
+        low, high = self.latencies[operation]
+        if self.distribution == 'fixed':
+            latency = (low + high) / 2
+        elif self.distribution == 'lognormal':
+            latency = rng.lognormvariate(math.log(max((low + high) / 2, 1e-6)), self.sigma)
+        elif self.distribution == 'replay':
+            samples = self.trace.get(operation) or [(low + high) / 2]
+            if self.seed is not None:
+                # A shared cursor would hand out entries in scheduling order, so seeded runs index by key
+                latency = samples[rng.randrange(len(samples))]
+            else:
+                position = self._replay_positions.get(operation, 0)
+                self._replay_positions[operation] = position + 1
+                latency = samples[position % len(samples)]
+        else:
+            latency = rng.uniform(low, high)
+        return latency * self.scale
+    
+    async def simulate(self, operation: str, rng: random.Random):
+        """Sleep for a sampled latency, injecting failures and timeouts at the configured rates."""
+        latency = self.sample(operation, rng)
+        outcome = rng.random()
+        if outcome < self.timeout_rate:
+            await asyncio.sleep(self.timeout_seconds * self.scale)
+            raise asyncio.TimeoutError(f"Injected timeout in mock {operation}")
+        await asyncio.sleep(latency)
+        if outcome < self.timeout_rate + self.failure_rate:
+            raise MockAIError(f"Injected failure in mock {operation}")
+
 class MockAISummarizer:
     """Mock AI summarizer that generates realistic research summaries."""
     
-    def __init__(self):
+    def __init__(self, summary_cache=None, latency_model: Optional[LatencyModel] = None):
+        self.summary_cache = summary_cache
+        self.latency_model = latency_model or LatencyModel.from_env()
         self.mock_responses = {
             "artificial intelligence": {
                 "summaries": [
@@ -83,14 +194,20 @@ class MockAISummarizer:
     
     async def summarize_source(self, source: Dict[str, Any]) -> Dict[str, str]:
         """Generate a mock summary for a source."""
-        # Simulate AI processing time
-        await asyncio.sleep(random.uniform(1, 3))
+        cached = await get_cached_summary(self.summary_cache, source)
+        if cached is not None:
+            return cached
+        
+        # Simulate AI processing time, admitted through the shared LLM limits like a real call
+        rng = self.latency_model.rng('summarize_source', source.get('url', ''))
+        async with scheduler.slot('llm', tokens=estimate_tokens(source.get('content', '')[:2000])):
+            await self.latency_model.simulate('summarize_source', rng)
         
         topic_key = self._get_topic_key(source.get('title', ''))
         summaries = self.mock_responses.get(topic_key, {}).get('summaries', [])
         
         if summaries:
-            mock_summary = random.choice(summaries)
+            mock_summary = rng.choice(summaries)
         else:
             # Generic fallback
             mock_summary = {
@@ -100,7 +217,7 @@ class MockAISummarizer:
                 "conclusion": "The findings suggest important implications for future research and practical applications"
             }
         
-        return {
+        result = {
             'title': source.get('title', 'Research Study'),
             'url': source.get('url', 'https://example.edu/research'),
             'summary': mock_summary['summary'],
@@ -109,10 +226,15 @@ class MockAISummarizer:
             'conclusion': mock_summary['conclusion'],
             'credibility_score': source.get('credibility_score', 0.85)
         }
+        
+        if self.summary_cache is not None:
+            self.summary_cache.set(summary_cache_key(source), result)
+        return result
     
     async def generate_reasoning_steps(self, topic: str, sources: List[Dict]) -> List[str]:
         """Generate mock reasoning steps."""
-        await asyncio.sleep(1)
+        async with scheduler.slot('llm'):
+            await self.latency_model.simulate('reasoning', self.latency_model.rng('reasoning', topic))
         
         return [
             f"1. Identified {len(sources)} credible sources related to {topic} from academic and research institutions",
@@ -140,7 +262,8 @@ class MockAISummarizer:
 class MockInsightGenerator:
     """Mock insight generator for demo purposes."""
     
-    def __init__(self):
+    def __init__(self, latency_model: Optional[LatencyModel] = None):
+        self.latency_model = latency_model or LatencyModel.from_env()
         self.insight_templates = {
             "artificial intelligence": {
                 "cross_insights": [
@@ -183,7 +306,8 @@ class MockInsightGenerator:
     async def generate_cross_insights(self, topic: str, summaries: List[Dict]) -> Dict[str, Any]:
         """Generate mock cross-insights."""
         # Simulate processing time
-        await asyncio.sleep(random.uniform(2, 4))
+        async with scheduler.slot('llm', tokens=estimate_tokens(str(summaries))):
+            await self.latency_model.simulate('insights', self.latency_model.rng('insights', topic))
         
         topic_key = self._get_topic_key(topic)
         template = self.insight_templates.get(topic_key, self.insight_templates['artificial intelligence'])
@@ -0,0 +1,205 @@
+"""
+Single-pass parsers for structured LLM output.
+
+Summaries and cross-insights come back either in the sectioned text format
+requested by the prompts or, in JSON mode, as a JSON object. Text is parsed
+with one compiled multiline regex per format, so each line is classified
+once and section bodies are collected in lists and joined at the end. Both
+formats produce SourceSummary / CrossInsight models directly.
+"""
+
+import re
+import json
+from typing import Dict, Any, List, Optional, Callable
+
+from models.schemas import SourceSummary, CrossInsight
+
+SUMMARY_FIELDS = ('summary', 'core_argument', 'evidence_used', 'conclusion')
+INSIGHT_SECTIONS = ('cross_insights', 'contradictions', 'emerging_trends', 'key_takeaways')
+
+# "- Summary: ..." style field headers and continuation text; other bullets never match
+_SUMMARY_LINE = re.compile(
+    r'^[ \t]*(?:'
+    r'-[ \t]*\**(?P<field>summary|core argument|evidence used|conclusion)\**[ \t]*:\**(?P<value>[^\n]*)'
+    r'|(?P<text>[^\s-][^\n]*)'
+    r')$',
+    re.MULTILINE | re.IGNORECASE
+)
+
+# Bulleted items, or any other line naming one of the insight sections
+_INSIGHT_LINE = re.compile(
+    r'^[ \t]*(?:'
+    r'(?:-(?!-)|[*•](?=[ \t]))[ \t]*(?P<item>[^\n]*)'
+    r'|[^\n]*?(?P<section>cross-insights|contradictions|emerging trends|key takeaways)[^\n]*'
+    r')$',
+    re.MULTILINE | re.IGNORECASE
+)
+
+# "=== SUMMARY 3 ===" delimiters between the per-source sections of a batched response; an echoed
+# "=== SOURCE 3 ===" prompt header also ends a section but never opens one
+_BATCH_DELIMITER = re.compile(
+    r'^[ \t]*={3,}[ \t]*(summary|source)[ \t]*#?(\d+)[ \t]*={3,}[ \t]*$', re.MULTILINE | re.IGNORECASE
+)
+
+_JSON_FENCE = re.compile(r'^```(?:json)?\s*(?P<body>.*?)\s*```$', re.DOTALL | re.IGNORECASE)
+_SOURCE_REF = re.compile(r'^source\s*(\d+)$', re.IGNORECASE)
+_URL = re.compile(r'^(?:[a-z][a-z0-9+.-]*://|www\.)\S+$', re.IGNORECASE)
+
+_FIELD_NAMES = {
+    'summary': 'summary',
+    'core argument': 'core_argument',
+    'evidence used': 'evidence_used',
+    'conclusion': 'conclusion',
+}
+_SECTION_NAMES = {
+    'cross-insights': 'cross_insights',
+    'contradictions': 'contradictions',
+    'emerging trends': 'emerging_trends',
+    'key takeaways': 'key_takeaways',
+}
+_JSON_ALIASES = {
+    'evidence': 'evidence_used',
+    'argument': 'core_argument',
+    'insights': 'cross_insights',
+    'trends': 'emerging_trends',
+    'takeaways': 'key_takeaways',
+    'confidence': 'confidence_level',
+    'sources': 'supporting_sources',
+}
+
+InsightLineParser = Callable[[str, List[Dict]], Dict[str, Any]]
+
+
+def _json_key(key: str) -> str:
+    key = re.sub(r'[\s-]+', '_', key.strip().lower())
+    return _JSON_ALIASES.get(key, key)
+
+
+def load_json_response(response: str) -> Optional[Dict[str, Any]]:
+    """The JSON object in a JSON-mode response (optionally fenced), or None for text responses."""
+    text = response.strip()
+    fenced = _JSON_FENCE.match(text)
+    if fenced:
+        text = fenced.group('body')
+    if not text.startswith('{'):
+        return None
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    return {_json_key(key): value for key, value in data.items()}
+
+
+def parse_summary(response: str, source: Dict[str, Any]) -> SourceSummary:
+    """Parse a summarization response, in either format, into a SourceSummary."""
+    fields: Dict[str, str] = {}
+    data = load_json_response(response)
+    if data is not None:
+        for name in SUMMARY_FIELDS:
+            value = data.get(name, '')
+            fields[name] = ' '.join(map(str, value)) if isinstance(value, list) else str(value or '').strip()
+    else:
+        buffers: Dict[str, List[str]] = {}
+        current = None
+        for match in _SUMMARY_LINE.finditer(response):
+            field = match.group('field')
+            if field is not None:
+                current = _FIELD_NAMES[field.lower()]
+                value = match.group('value').strip()
+                buffers[current] = [value] if value else []
+            elif current is not None and match.group('text') is not None:
+                buffers[current].append(match.group('text').strip())
+        fields = {name: ' '.join(buffers.get(name, ())) for name in SUMMARY_FIELDS}
+
+    return SourceSummary(
+        title=source.get('title', 'N/A'),
+        url=source.get('url', 'N/A'),
+        credibility_score=source.get('credibility_score', 0.7),
+        **fields
+    )
+
+
+def split_batch_response(response: str) -> Dict[int, str]:
+    """Per-source sections of a batched summarization response, keyed by their 1-based number."""
+    sections: Dict[int, str] = {}
+    delimiters = list(_BATCH_DELIMITER.finditer(response))
+    for delimiter, following in zip(delimiters, delimiters[1:] + [None]):
+        if delimiter.group(1).lower() != 'summary':
+            continue
+        end = following.start() if following is not None else len(response)
+        sections.setdefault(int(delimiter.group(2)), response[delimiter.end():end])
+    return sections
+
+
+def _confidence(value: Any) -> str:
+    value = str(value or '').strip().capitalize()
+    return value if value in ('High', 'Medium', 'Low') else 'Medium'
+
+
+def _json_insight(item: Any, summaries: List[Dict], parse_line: InsightLineParser) -> CrossInsight:
+    if not isinstance(item, dict):
+        return CrossInsight(**parse_line(str(item), summaries))
+
+    item = {_json_key(key): value for key, value in item.items()}
+    text = str(item.get('insight', ''))
+    sources = item.get('supporting_sources')
+    urls = _resolve_refs(sources if isinstance(sources, list) else [sources], summaries) if sources else []
+    if not urls:
+        # Fall back to attributing the insight from its text
+        fields = parse_line(text, summaries)
+        if item.get('confidence_level'):
+            fields['confidence_level'] = _confidence(item['confidence_level'])
+        return CrossInsight(**fields)
+    return CrossInsight(insight=text, supporting_sources=urls, confidence_level=_confidence(item.get('confidence_level')))
+
+
+def _resolve_refs(refs: List[Any], summaries: List[Dict]) -> List[str]:
+    """URLs for cited sources; numbered refs ("Source 2", 2) map to summaries, unresolvable refs are dropped."""
+    urls = []
+    for ref in refs:
+        ref = str(ref).strip()
+        numbered = _SOURCE_REF.match(ref)
+        index = int(numbered.group(1)) if numbered else int(ref) if ref.isdigit() else None
+        if index is not None:
+            if 1 <= index <= len(summaries) and summaries[index - 1].get('url'):
+                urls.append(summaries[index - 1]['url'])
+        elif _URL.match(ref):
+            urls.append(ref)
+    return urls
+
+
+def parse_insights(response: str, summaries: List[Dict], parse_line: InsightLineParser) -> Dict[str, Any]:
+    """Parse an insight response, in either format, into CrossInsight models and string lists.
+
+    ``parse_line`` turns a free-text insight into CrossInsight fields
+    (confidence and supporting sources).
+    """
+    data = load_json_response(response)
+    if data is not None:
+        sections: Dict[str, Any] = {}
+        for name in INSIGHT_SECTIONS:
+            items = data.get(name) or []
+            items = items if isinstance(items, list) else [items]
+            if name == 'cross_insights':
+                sections[name] = [_json_insight(item, summaries, parse_line) for item in items if item]
+            else:
+                sections[name] = [str(item).strip() for item in items if str(item).strip()]
+        return sections
+
+    sections = {name: [] for name in INSIGHT_SECTIONS}
+    current = None
+    for match in _INSIGHT_LINE.finditer(response):
+        item = match.group('item')
+        if item is None:
+            current = _SECTION_NAMES[match.group('section').lower()]
+            continue
+        item = item.strip()
+        if current is None or not item:
+            continue
+        if current == 'cross_insights':
+            sections[current].append(CrossInsight(**parse_line(item, summaries)))
+        else:
+            sections[current].append(item)
+    return sections
@@ -0,0 +1,412 @@
+import asyncio
+from datetime import datetime
+from typing import List, Dict, Any, AsyncIterator, Callable, Awaitable, Optional, Tuple
+import logging
+
+from core.cache import TieredCache, StaleWhileRevalidateCache, normalize_topic
+from core.metrics import STAGE_SECONDS, RESEARCH_RESULTS, new_trace_id, traced_context
+from core.singleflight import SingleFlight
+from core.summarizer import summary_cache_key
+from core.search import FallbackSources
+from core.parsing import INSIGHT_SECTIONS
+from models.schemas import ResearchRequest, ResearchReport, SourceSummary, CrossInsight
+
+logger = logging.getLogger(__name__)
+
+# A stage is a tuple of (dependency names, coroutine factory). The factory receives
+# the results of the stages completed so far, keyed by stage name.
+Stage = Tuple[Tuple[str, ...], Callable[[Dict[str, Any]], Awaitable[Any]]]
+
+# Streaming event names for stages whose results are emitted as a whole; summaries
+# are emitted one at a time as each source finishes.
+STREAM_EVENTS = {
+    'search': 'sources',
+    'reasoning': 'reasoning_steps',
+    'insights': 'insights',
+}
+
+
+class NoSourcesError(Exception):
+    """Raised when the search stage finds no credible sources."""
+
+
+class ResearchPipeline:
+    """Runs the research workflow as a dependency-aware graph of stages.
+
+    search -> {reasoning, summaries} -> insights -> report
+
+    Each stage starts as soon as the stages it depends on have finished, so
+    reasoning steps and per-source summaries run concurrently and end-to-end
+    latency follows the critical path rather than the sum of all stages.
+    """
+
+    def __init__(self, searcher, summarizer, insight_generator, report_cache: Optional[TieredCache] = None,
+                 report_store=None, search_cache: Optional[StaleWhileRevalidateCache] = None, fetcher=None):
+        self.searcher = searcher
+        self.summarizer = summarizer
+        self.insight_generator = insight_generator
+        self.report_cache = report_cache
+        self.report_store = report_store
+        self.search_cache = search_cache
+        self.fetcher = fetcher
+        self._revalidating: Dict[str, asyncio.Task] = {}
+
+        # Identical concurrent work is coalesced at each level of the pipeline
+        self.research_flights = SingleFlight()
+        self.search_flights = SingleFlight()
+        self.summary_flights = SingleFlight()
+
+    @staticmethod
+    def cache_key(request: ResearchRequest) -> str:
+        """Key a request on its normalized topic and source count."""
+        return f"{normalize_topic(request.topic)}|{request.max_sources}"
+
+    def _build_stages(self, request: ResearchRequest, on_summary: Optional[Callable] = None) -> Dict[str, Stage]:
+        """Declare the stages of a research run and their dependencies."""
+        sources = self._sources_stage()
+        return {
+            **self._source_stages(request),
+            'reasoning': (('search',), lambda results: self._reason(request, results['search'])),
+            'summaries': ((sources,), lambda results: self._summarize(results[sources], on_summary)),
+            'insights': (('summaries',), lambda results: self._generate_insights(request, results['summaries'])),
+        }
+
+    def _sources_stage(self) -> str:
+        """Name of the stage whose result holds the sources to summarize."""
+        return 'fetch' if self.fetcher is not None else 'search'
+
+    def _source_stages(self, request: ResearchRequest) -> Dict[str, Stage]:
+        """Search, followed by the full-text fetch stage when a fetcher is configured."""
+        stages = {'search': ((), lambda results: self._search(request))}
+        if self.fetcher is not None:
+            stages['fetch'] = (('search',), lambda results: self._fetch(results['search']))
+        return stages
+
+    async def _run_stages(self, stages: Dict[str, Stage], on_complete: Optional[Callable] = None) -> Dict[str, Any]:
+        """Execute stages concurrently, each one as soon as its dependencies resolve."""
+        results: Dict[str, Any] = {}
+        pending = dict(stages)
+        running: Dict[asyncio.Task, str] = {}
+
+        try:
+            while pending or running:
+                for name, (deps, factory) in list(pending.items()):
+                    if all(dep in results for dep in deps):
+                        running[asyncio.create_task(self._timed(name, factory(results)))] = name
+                        del pending[name]
+
+                if not running:
+                    raise RuntimeError(f"Unresolvable stage dependencies: {sorted(pending)}")
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    results[name] = task.result()
+                    if on_complete is not None:
+                        on_complete(name, results[name])
+        finally:
+            for task in running:
+                task.cancel()
+
+        return results
+
+    def search_key(self, topic: str, max_results: int) -> str:
+        """Key a search on its normalized query, result count and the searcher's depth and domain filters."""
+        return f"{normalize_topic(topic)}|{max_results}|{getattr(self.searcher, 'cache_scope', '')}"
+
+    async def search_sources(self, topic: str, max_results: int = 3,
+                             cache_control: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Search for sources, serving cached results and sharing identical in-flight searches.
+
+        A stale cached result is returned immediately while a background
+        search refreshes it. ``cache_control`` follows ResearchRequest:
+        ``no-cache`` skips the lookup, ``no-store`` also skips storing.
+        """
+        key = self.search_key(topic, max_results)
+        if self.search_cache is not None and cache_control is None:
+            sources, stale = self.search_cache.get(key)
+            if sources is not None:
+                if stale:
+                    self._revalidate(key, topic, max_results)
+                return sources
+
+        return await self._fetch_sources(key, topic, max_results, store=cache_control != 'no-store')
+
+    async def _fetch_sources(self, key: str, topic: str, max_results: int, store: bool = True) -> List[Dict[str, Any]]:
+        sources = await self.search_flights.do(key, lambda: self.searcher.search_sources(topic, max_results))
+        # Mock sources stand in for a failed search; caching them would hide the outage for the
+        # whole TTL, so the next request searches again (and a stale entry stays as it was)
+        if self.search_cache is not None and store and not isinstance(sources, FallbackSources):
+            self.search_cache.set(key, sources)
+        return sources
+
+    def _revalidate(self, key: str, topic: str, max_results: int):
+        """Refresh a stale search result in the background, at most once at a time per key."""
+        if key in self._revalidating:
+            return
+
+        def finished(task: asyncio.Task):
+            self._revalidating.pop(key, None)
+            if not task.cancelled() and task.exception() is not None:
+                logger.error(f"Search revalidation error: {str(task.exception())}")
+
+        # The refresh outlives the request that noticed the stale entry, so it gets its own trace id
+        trace_id = new_trace_id()
+        logger.info(f"Revalidating stale search results for {topic!r} under trace {trace_id}")
+        task = asyncio.create_task(self._fetch_sources(key, topic, max_results), context=traced_context(trace_id))
+        self._revalidating[key] = task
+        task.add_done_callback(finished)
+
+    async def summarize_source(self, source: Dict[str, Any]) -> Dict[str, Any]:
+        """Summarize a source, sharing the result with identical in-flight summaries."""
+        return await self.summary_flights.do(
+            summary_cache_key(source),
+            lambda: self.summarizer.summarize_source(source)
+        )
+
+    @staticmethod
+    async def _timed(stage: str, awaitable: Awaitable[Any]) -> Any:
+        with STAGE_SECONDS.time(stage=stage):
+            return await awaitable
+
+    async def _search(self, request: ResearchRequest) -> List[Dict[str, Any]]:
+        logger.info("Step 1: Searching for sources...")
+        # Incremental refreshes exist to pick up changed sources, so they always search afresh
+        sources = await self.search_sources(
+            request.topic, request.max_sources, 'no-cache' if request.incremental else request.cache_control
+        )
+
+        if not sources:
+            raise NoSourcesError("No credible sources found for the topic")
+
+        logger.info(f"Found {len(sources)} sources")
+        return sources
+
+    async def _fetch(self, sources: List[Dict]) -> List[Dict[str, Any]]:
+        logger.info(f"Fetching full text for {len(sources)} sources...")
+        return await self.fetcher.enrich(sources)
+
+    async def _reason(self, request: ResearchRequest, sources: List[Dict]) -> List[str]:
+        logger.info("Step 2: Generating reasoning steps...")
+        return await self.summarizer.generate_reasoning_steps(request.topic, sources)
+
+    async def _summarize(self, sources: List[Dict], on_summary: Optional[Callable] = None) -> List[Dict[str, Any]]:
+        logger.info("Step 3: Summarizing sources...")
+        summarization_tasks = [
+            self._summarize_one(index, source, on_summary) for index, source in enumerate(sources)
+        ]
+        return await asyncio.gather(*summarization_tasks)
+
+    async def _summarize_one(self, index: int, source: Dict, on_summary: Optional[Callable]) -> Dict[str, Any]:
+        summary = await self._timed('summarize_source', self.summarize_source(source))
+        if on_summary is not None:
+            on_summary(index, summary)
+        return summary
+
+    async def _generate_insights(self, request: ResearchRequest, summaries: List[Dict]) -> Dict[str, Any]:
+        logger.info("Step 4: Generating cross-insights...")
+        return await self.insight_generator.generate_cross_insights(request.topic, summaries)
+
+    def _compile_report(self, request: ResearchRequest, results: Dict[str, Any]) -> ResearchReport:
+        logger.info("Step 5: Compiling final report...")
+        with STAGE_SECONDS.time(stage='compile'):
+            return self._build_report(request, results)
+
+    def _build_report(self, request: ResearchRequest, results: Dict[str, Any]) -> ResearchReport:
+        insights_data = results['insights']
+
+        return ResearchReport(
+            topic=request.topic,
+            timestamp=datetime.now(),
+            article_summaries=[SourceSummary(**summary_data) for summary_data in results['summaries']],
+            cross_insights=[CrossInsight(**insight) for insight in insights_data.get('cross_insights', [])],
+            key_takeaways=insights_data.get('key_takeaways', []),
+            contradictions=insights_data.get('contradictions', []),
+            emerging_trends=insights_data.get('emerging_trends', []),
+            reasoning_steps=results['reasoning']
+        )
+
+    async def run(self, request: ResearchRequest) -> ResearchReport:
+        """Run the full research workflow for a request, serving from cache when possible."""
+        key = self.cache_key(request)
+        if request.incremental:
+            return await self.research_flights.do(f"{key}|incremental", lambda: self._refresh(request, key))
+
+        if self.report_cache is not None and request.cache_control is None:
+            cached = await self.report_cache.aget(key)
+            if cached is not None:
+                logger.info(f"Serving cached report for topic: {request.topic}")
+                RESEARCH_RESULTS.inc(outcome='cache_hit')
+                return ResearchReport(**cached)
+
+        return await self.research_flights.do(key, lambda: self._research(request, key))
+
+    async def _research(self, request: ResearchRequest, key: str) -> ResearchReport:
+        logger.info(f"Starting research for topic: {request.topic}")
+        try:
+            results = await self._run_stages(self._build_stages(request))
+            report = self._compile_report(request, results)
+        except Exception:
+            RESEARCH_RESULTS.inc(outcome='failed')
+            raise
+        RESEARCH_RESULTS.inc(outcome='completed')
+
+        await self._persist(request, key, report, results[self._sources_stage()])
+        logger.info("Research completed successfully")
+        return report
+
+    async def _refresh(self, request: ResearchRequest, key: str) -> ResearchReport:
+        """Rebuild the latest stored report, reprocessing only new or changed sources.
+
+        Sources whose URL and content hash match the stored report reuse its
+        summaries; insights and reasoning steps are regenerated only when the
+        set of summarized sources actually changed.
+        """
+        previous = None
+        if self.report_store is not None:
+            previous = await asyncio.to_thread(self.report_store.latest, request.topic, request.max_sources)
+        if previous is None:
+            logger.info(f"No stored report to refresh for topic: {request.topic}; running full research")
+            return await self._research(request, key)
+
+        stored_sources = await asyncio.to_thread(self.report_store.sources, previous['id'])
+        old_report = previous['report']
+        known = {
+            (source['url'], source['content_hash']): summary
+            for source, summary in zip(stored_sources, old_report['article_summaries'])
+        }
+
+        logger.info(f"Refreshing stored report {previous['id']} for topic: {request.topic}")
+        changed = {}
+        sources = self._sources_stage()
+        stages = {
+            **self._source_stages(request),
+            'summaries': ((sources,), lambda results: self._summarize_changed(results[sources], known, changed)),
+            'reasoning': (('summaries',), lambda results: self._reuse_or_run(
+                changed['any'], old_report['reasoning_steps'],
+                lambda: self._reason(request, results['search'])
+            )),
+            'insights': (('summaries',), lambda results: self._reuse_or_run(
+                changed['any'], {name: old_report[name] for name in INSIGHT_SECTIONS},
+                lambda: self._generate_insights(request, results['summaries'])
+            )),
+        }
+
+        try:
+            results = await self._run_stages(stages)
+            report = self._compile_report(request, results)
+        except Exception:
+            RESEARCH_RESULTS.inc(outcome='failed')
+            raise
+        RESEARCH_RESULTS.inc(outcome='refreshed')
+
+        # An unchanged refresh would only archive a duplicate of the stored report
+        await self._persist(request, key, report, results[self._sources_stage()], archive=changed['any'])
+        logger.info(
+            f"Refresh completed: {changed['reused']} summaries reused, {changed['summarized']} summarized, "
+            f"insights {'regenerated' if changed['any'] else 'reused'}"
+        )
+        return report
+
+    async def _summarize_changed(self, sources: List[Dict], known: Dict[Tuple[str, str], Dict],
+                                 changed: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Summarize only sources missing from ``known``; record what changed in ``changed``."""
+        keys = [(source.get('url', ''), summary_cache_key(source)) for source in sources]
+        summaries: List[Any] = [None] * len(sources)
+        fresh = []
+        for index, (source, source_key) in enumerate(zip(sources, keys)):
+            if source_key in known:
+                previous = known[source_key]
+                summaries[index] = {
+                    **previous, 'credibility_score': source.get('credibility_score', previous['credibility_score'])
+                }
+            else:
+                fresh.append(index)
+
+        if fresh:
+            logger.info(f"Step 3: Summarizing {len(fresh)} new or changed sources...")
+            results = await asyncio.gather(*(self._summarize_one(index, sources[index], None) for index in fresh))
+            for index, summary in zip(fresh, results):
+                summaries[index] = summary
+
+        changed.update(any=set(keys) != set(known), reused=len(sources) - len(fresh), summarized=len(fresh))
+        return summaries
+
+    @staticmethod
+    async def _reuse_or_run(changed: bool, previous: Any, factory: Callable[[], Awaitable[Any]]) -> Any:
+        return await factory() if changed else previous
+
+    async def _persist(self, request: ResearchRequest, key: str, report: ResearchReport, sources: List[Dict],
+                       archive: bool = True):
+        """Cache and (when ``archive``) archive a freshly compiled report unless the request opted out."""
+        if request.cache_control == 'no-store':
+            return
+        if self.report_cache is not None:
+            self.report_cache.set(key, report.model_dump(mode='json'))
+        if self.report_store is not None and archive:
+            try:
+                await asyncio.to_thread(self.report_store.save, report, sources, request.max_sources)
+            except Exception as e:
+                logger.error(f"Report store error: {str(e)}")
+
+    async def stream(self, request: ResearchRequest) -> AsyncIterator[Dict[str, Any]]:
+        """Run the workflow, yielding each stage's result as soon as it is available.
+
+        Events are emitted in completion order: ``sources``, then ``reasoning_steps``
+        and one ``summary`` per source interleaved as they finish, then ``insights``
+        and finally the compiled ``report``. Cached reports and incremental
+        refreshes are emitted as a single ``report`` event.
+        """
+        key = self.cache_key(request)
+        if request.incremental:
+            report = await self.run(request)
+            yield {'event': 'report', 'data': report.model_dump(mode='json')}
+            return
+
+        if self.report_cache is not None and request.cache_control is None:
+            cached = await self.report_cache.aget(key)
+            if cached is not None:
+                logger.info(f"Serving cached report for topic: {request.topic}")
+                RESEARCH_RESULTS.inc(outcome='cache_hit')
+                yield {'event': 'report', 'data': cached}
+                return
+
+        logger.info(f"Starting streamed research for topic: {request.topic}")
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def publish_stage(name: str, result: Any):
+            if name in STREAM_EVENTS:
+                queue.put_nowait({'event': STREAM_EVENTS[name], 'data': result})
+
+        def publish_summary(index: int, summary: Dict[str, Any]):
+            queue.put_nowait({'event': 'summary', 'data': {'index': index, **summary}})
+
+        stages = self._build_stages(request, on_summary=publish_summary)
+        runner = asyncio.create_task(self._run_stages(stages, on_complete=publish_stage))
+        runner.add_done_callback(lambda _: queue.put_nowait(None))
+
+        try:
+            while (event := await queue.get()) is not None:
+                yield event
+
+            try:
+                results = runner.result()
+                report = self._compile_report(request, results)
+            except Exception:
+                RESEARCH_RESULTS.inc(outcome='failed')
+                raise
+            RESEARCH_RESULTS.inc(outcome='completed')
+
+            await self._persist(request, key, report, results[self._sources_stage()])
+            logger.info("Research completed successfully")
+            yield {'event': 'report', 'data': report.model_dump(mode='json')}
+        finally:
+            runner.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Single-flight counters for each coalesced level."""
+        return {
+            'research': self.research_flights.stats(),
+            'search': self.search_flights.stats(),
+            'summaries': self.summary_flights.stats()
+        }
@@ -0,0 +1,105 @@
+"""
+Token-budgeted prompt content.
+
+Source text and summaries are fitted to a token budget by extractive
+compression instead of blind truncation: the text is split into sentences,
+each sentence is scored by the query terms it contains (terms that are rare
+within the text count more, figures get a bonus since they are usually the
+evidence), and the best sentences are kept, in their original order, until
+the budget is spent. Token counts use the scheduler's local estimate.
+"""
+
+import re
+import math
+from collections import Counter
+from typing import Dict, Any, List
+
+from core.scheduler import estimate_tokens
+from core.attribution import tokenize
+from core.parsing import SUMMARY_FIELDS
+
+# estimate_tokens counts about four characters per token
+CHARS_PER_TOKEN = 4
+
+_SENTENCE_BREAK = re.compile(r'(?:(?<=[.!?])|(?<=[.!?]["\')\]]))\s+|\n+')
+_FIGURE = re.compile(r'\d')
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in _SENTENCE_BREAK.split(text) if sentence and sentence.strip()]
+
+
+def compress_text(text: str, query: str, max_tokens: int) -> str:
+    """The sentences of ``text`` most relevant to ``query`` that fit in ``max_tokens``, in text order."""
+    text = (text or '').strip()
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    # Scraped pages repeat boilerplate; each distinct sentence is only a candidate once
+    sentences = list(dict.fromkeys(split_sentences(text)))
+    sentence_tokens = [set(tokenize(sentence)) for sentence in sentences]
+    terms = set(tokenize(query))
+    document_frequency = Counter(token for tokens in sentence_tokens for token in tokens & terms)
+    count = len(sentences)
+
+    scores = []
+    for position, (sentence, tokens) in enumerate(zip(sentences, sentence_tokens)):
+        score = sum(math.log(1 + count / document_frequency[token]) for token in tokens & terms)
+        if _FIGURE.search(sentence):
+            score += 0.5
+        if position == 0:
+            # Opening sentences usually say what the text is about
+            score += 1.0
+        scores.append(score)
+
+    ranked = sorted(range(count), key=lambda i: (-scores[i], i))
+    kept, used = [], 0
+    for position in ranked:
+        cost = estimate_tokens(sentences[position])
+        if used + cost <= max_tokens:
+            kept.append(position)
+            used += cost
+    if not kept:
+        # Not even the best sentence fits; cut it to the budget
+        return sentences[ranked[0]][:max_tokens * CHARS_PER_TOKEN]
+    return ' '.join(sentences[position] for position in sorted(kept))
+
+
+class PromptBuilder:
+    """Fits source content and summaries into per-prompt token budgets."""
+
+    def __init__(self, source_tokens: int = 400, summaries_tokens: int = 6000, min_summary_tokens: int = 80):
+        self.source_tokens = source_tokens
+        self.summaries_tokens = summaries_tokens
+        self.min_summary_tokens = min_summary_tokens
+
+    def source_content(self, source: Dict[str, Any]) -> str:
+        """Source content to summarize, compressed around the source's title."""
+        return compress_text(source.get('content') or '', source.get('title') or '', self.source_tokens)
+
+    def summary_budget(self, count: int, reserved: int = 0) -> int:
+        """Tokens each of ``count`` summaries may use in an analysis prompt.
+
+        ``reserved`` tokens of fixed prompt text (system prompt, per-source
+        headers) are taken off the budget before it is shared out.
+        """
+        return max(self.min_summary_tokens, (self.summaries_tokens - reserved) // max(1, count))
+
+    def compress_summary(self, summary: Dict[str, Any], topic: str, max_tokens: int) -> Dict[str, Any]:
+        """A copy of ``summary`` whose text fields fit in ``max_tokens`` together.
+
+        Fields shorter than an even share are kept whole and their unused share
+        goes to the longer fields, which are compressed.
+        """
+        sizes = {field: estimate_tokens(str(summary.get(field) or '')) for field in SUMMARY_FIELDS}
+        if sum(sizes.values()) <= max_tokens:
+            return summary
+        compressed = dict(summary)
+        remaining = max_tokens
+        fields = sorted(SUMMARY_FIELDS, key=sizes.get)
+        for left, field in zip(range(len(fields), 0, -1), fields):
+            share = max(1, remaining // left)
+            if sizes[field] > share:
+                compressed[field] = compress_text(str(summary.get(field) or ''), topic, share)
+            remaining -= min(sizes[field], share)
+        return compressed
@@ -0,0 +1,192 @@
+"""
+Shared scheduler for outbound LLM and search calls.
+
+Every provider gets a priority-aware concurrency limit plus optional token
+buckets for requests/minute and tokens/minute. Interactive requests are
+always admitted ahead of queued batch work. The priority of the current
+call is carried in a context variable so batch jobs only need to set it once.
+"""
+
+import os
+import time
+import heapq
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional
+
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BATCH: 'batch'}
+
+current_priority: ContextVar[int] = ContextVar('current_priority', default=INTERACTIVE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1) -> float:
+        """Wait until ``amount`` tokens are available; returns the time spent waiting."""
+        # Requests larger than the bucket would never fit, so cap them at capacity
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return waited
+            delay = (amount - self.tokens) / self.rate
+            await asyncio.sleep(delay)
+            waited += delay
+
+
+class PrioritySemaphore:
+    """Semaphore that hands freed slots to the highest-priority waiter first."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self._waiters: List = []
+        self._counter = itertools.count()
+
+    async def acquire(self, priority: int = INTERACTIVE):
+        if self.in_use < self.limit and not self._waiters:
+            self.in_use += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._counter), future]
+        heapq.heappush(self._waiters, entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just before cancellation; pass it on
+                self.release()
+            elif entry in self._waiters:
+                # release() may already have popped and skipped the cancelled entry
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def release(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_use -= 1
+
+    def waiting(self) -> Dict[str, int]:
+        counts = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                counts[PRIORITY_NAMES.get(priority, str(priority))] += 1
+        return counts
+
+
+class ProviderLimiter:
+    """Concurrency and rate limits for a single outbound provider."""
+
+    def __init__(self, name: str, max_concurrency: int, requests_per_minute: float = 0, tokens_per_minute: float = 0):
+        self.name = name
+        self.semaphore = PrioritySemaphore(max_concurrency)
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.calls = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 0, priority: Optional[int] = None):
+        priority = current_priority.get() if priority is None else priority
+        started = time.monotonic()
+        await self.semaphore.acquire(priority)
+        try:
+            # Rate limits are taken while holding the slot so queued work keeps its priority order
+            throttled = 0.0
+            if self.request_bucket is not None:
+                throttled += await self.request_bucket.acquire(1)
+            if self.token_bucket is not None and tokens:
+                throttled += await self.token_bucket.acquire(tokens)
+
+            self.calls += 1
+            self.throttled += throttled > 0
+            self.wait_seconds += time.monotonic() - started
+            yield
+        finally:
+            self.semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'max_concurrency': self.semaphore.limit,
+            'in_use': self.semaphore.in_use,
+            'queue_depth': self.semaphore.waiting(),
+            'calls': self.calls,
+            'throttled_calls': self.throttled,
+            'avg_wait_seconds': self.wait_seconds / self.calls if self.calls else 0.0
+        }
+
+
+class Scheduler:
+    """Registry of provider limiters shared by all pipeline components.
+
+    Limiters are built from the environment on first use, so settings loaded
+    from ``.env`` after import are still honoured.
+    """
+
+    def __init__(self, providers: Optional[Dict[str, ProviderLimiter]] = None):
+        self._providers = providers
+
+    @property
+    def providers(self) -> Dict[str, ProviderLimiter]:
+        if self._providers is None:
+            self._providers = self._providers_from_env()
+        return self._providers
+
+    def configure(self, providers: Dict[str, ProviderLimiter]):
+        """Replace the provider limiters (e.g. for benchmarks)."""
+        self._providers = providers
+
+    @staticmethod
+    def _providers_from_env() -> Dict[str, ProviderLimiter]:
+        return {
+            'llm': ProviderLimiter(
+                'llm',
+                max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+                requests_per_minute=float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0")),
+                tokens_per_minute=float(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+            ),
+            'search': ProviderLimiter(
+                'search',
+                max_concurrency=int(os.getenv("SEARCH_MAX_CONCURRENCY", "8")),
+                requests_per_minute=float(os.getenv("SEARCH_REQUESTS_PER_MINUTE", "0"))
+            ),
+        }
+
+    def slot(self, provider: str, tokens: int = 0, priority: Optional[int] = None):
+        """Async context manager admitting one call to ``provider``."""
+        return self.providers[provider].slot(tokens=tokens, priority=priority)
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: limiter.stats() for name, limiter in self.providers.items()}
+
+
+scheduler = Scheduler()
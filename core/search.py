@@ -1,8 +1,16 @@
 import os
+import json
+import random
 import asyncio
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Dict, Any, Optional
 import logging
 
+from core.scheduler import scheduler
+from core.credibility import CredibilityScorer
+from core.dedup import SourceDeduplicator
+
 # Tavily import made optional for demo mode
 try:
     from tavily import TavilyClient
@@ -13,38 +21,156 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+
+class FallbackSources(list):
+    """Mock sources returned because the real search failed; not a result worth caching."""
+
+
+class SearchProvider:
+    """A search backend returning raw result dicts with title, url and content.
+
+    Providers only fetch; credibility ranking and deduplication are applied by
+    the searcher that owns them.
+    """
+
+    name = "provider"
+
+    @property
+    def cache_scope(self) -> str:
+        """Everything besides the query that shapes this provider's results."""
+        return self.name
+
+    async def search(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class TavilyProvider(SearchProvider):
+    """Tavily web search, with the blocking client offloaded to a bounded pool."""
+
+    name = "tavily"
+
+    def __init__(self, client=None, max_workers: Optional[int] = None, timeout: Optional[float] = None):
+        self.client = client or TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+        
+        # The Tavily client is synchronous, so calls are offloaded to a dedicated
+        # bounded pool to keep the event loop free while a search is in flight.
+        self.max_workers = max_workers or int(os.getenv("SEARCH_MAX_WORKERS", "4"))
+        self.timeout = timeout or float(os.getenv("SEARCH_TIMEOUT", "30"))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="search")
+        self._semaphore = asyncio.Semaphore(self.max_workers)
+        
+        self.search_depth = "advanced"
+        self.include_domains = ["edu", "org", "gov", "arxiv.org", "pubmed.ncbi.nlm.nih.gov"]
+        self.exclude_domains = ["wikipedia.org", "reddit.com", "quora.com"]
+
+    @property
+    def cache_scope(self) -> str:
+        return f"{self.name}:{self.search_depth}:+{','.join(self.include_domains)}:-{','.join(self.exclude_domains)}"
+
+    async def search(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        """Run a blocking Tavily search in the search pool, bounded by the timeout."""
+        loop = asyncio.get_running_loop()
+        search = partial(
+            self.client.search,
+            query=query,
+            search_depth=self.search_depth,
+            max_results=max_results,
+            include_domains=self.include_domains,
+            exclude_domains=self.exclude_domains
+        )
+        async with scheduler.slot('search'), self._semaphore:
+            results = await asyncio.wait_for(loop.run_in_executor(self._executor, search), timeout=self.timeout)
+        return results.get("results", [])
+
+    def close(self):
+        """Release the search worker pool."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class StubProvider(SearchProvider):
+    """Local provider returning synthetic sources, for development and tests.
+
+    Latency, jitter and failure rate are configurable so hedging and circuit
+    breaking can be exercised without network access.
+    """
+
+    def __init__(self, name: str = "stub", latency: float = 0.0, jitter: float = 0.0,
+                 failure_rate: float = 0.0, seed: Optional[int] = None, domain: Optional[str] = None):
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.domain = domain or f"{name}.example.org"
+        self.calls = 0
+        self._rng = random.Random(seed)
+
+    async def search(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        self.calls += 1
+        await asyncio.sleep(max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter)))
+        if self._rng.random() < self.failure_rate:
+            raise RuntimeError(f"{self.name} search failed")
+
+        slug = query.replace(' ', '-')
+        return [
+            {
+                "title": f"{query} research note {i + 1} ({self.name})",
+                "url": f"https://{self.domain}/{slug}/{i + 1}",
+                "content": f"A {self.name} study of {query}, covering data and analysis from source {i + 1}."
+            }
+            for i in range(max_results)
+        ]
+
+
 class WebSearcher:
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None, timeout: Optional[float] = None,
+                 scorer: Optional[CredibilityScorer] = None, deduplicator: Optional[SourceDeduplicator] = None):
         if TAVILY_AVAILABLE and os.getenv("TAVILY_API_KEY") and os.getenv("TAVILY_API_KEY") != "demo_mode":
-            self.tavily_client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+            self.provider = TavilyProvider(max_workers=max_workers, timeout=timeout)
         else:
-            self.tavily_client = None
+            self.provider = None
+        self.timeout = timeout or float(os.getenv("SEARCH_TIMEOUT", "30"))
+        
+        # CREDIBILITY_WEIGHTS may override individual weights, e.g. '{"commercial_domain": 0.0}'
+        self.scorer = scorer or CredibilityScorer(weights=json.loads(os.getenv("CREDIBILITY_WEIGHTS", "{}")))
+        self.deduplicator = deduplicator or SourceDeduplicator(max_distance=int(os.getenv("DEDUP_MAX_DISTANCE", "3")))
+    
+    @property
+    def cache_scope(self) -> str:
+        return self.provider.cache_scope if self.provider is not None else "mock"
+    
+    def close(self):
+        """Release the search worker pool."""
+        if self.provider is not None:
+            self.provider.close()
     
     async def search_sources(self, topic: str, max_results: int = 3) -> List[Dict[str, Any]]:
         """Search for credible sources on the given topic."""
         try:
-            if self.tavily_client:
+            if self.provider:
                 # Use Tavily for comprehensive web search
-                search_results = self.tavily_client.search(
-                    query=topic,
-                    search_depth="advanced",
-                    max_results=max_results * 2,  # Get more to filter for quality
-                    include_domains=["edu", "org", "gov", "arxiv.org", "pubmed.ncbi.nlm.nih.gov"],
-                    exclude_domains=["wikipedia.org", "reddit.com", "quora.com"]
+                search_results = await self.provider.search(
+                    topic,
+                    max_results=max_results * 2  # Get more to filter for quality
                 )
                 
                 # Filter and rank sources by credibility
-                credible_sources = self._filter_credible_sources(search_results.get("results", []))
+                credible_sources = self._filter_credible_sources(search_results)
                 
-                # Return top N sources
-                return credible_sources[:max_results]
+                # Return top N distinct sources; duplicates free their slot for the next candidate
+                return self.deduplicator.deduplicate(credible_sources, limit=max_results)
             else:
                 # Fall back to mock sources for demo mode
                 return await self._get_mock_sources(topic, max_results)
             
+        except asyncio.TimeoutError:
+            logger.error(f"Search timed out after {self.timeout}s")
+            return FallbackSources(await self._get_mock_sources(topic, max_results))
         except Exception as e:
             logger.error(f"Search error: {str(e)}")
-            return await self._get_mock_sources(topic, max_results)
+            return FallbackSources(await self._get_mock_sources(topic, max_results))
     
     async def _get_mock_sources(self, topic: str, max_results: int = 3) -> List[Dict[str, Any]]:
         """Get mock sources for demo mode."""
@@ -73,43 +199,12 @@ class WebSearcher:
     
     def _filter_credible_sources(self, sources: List[Dict]) -> List[Dict]:
         """Filter and score sources based on credibility indicators."""
-        scored_sources = []
-        
-        for source in sources:
-            score = self._calculate_credibility_score(source)
-            if score >= 0.6:  # Only include sources with decent credibility
-                source["credibility_score"] = score
-                scored_sources.append(source)
-        
-        # Sort by credibility score
-        return sorted(scored_sources, key=lambda x: x["credibility_score"], reverse=True)
+        # Only include sources with decent credibility, sorted best first
+        return self.scorer.filter_credible(sources, threshold=0.6)
     
     def _calculate_credibility_score(self, source: Dict) -> float:
         """Calculate credibility score based on various factors."""
-        score = 0.5  # Base score
-        url = source.get("url", "").lower()
-        title = source.get("title", "").lower()
-        content = source.get("content", "").lower()
-        
-        # Domain credibility
-        if any(domain in url for domain in [".edu", ".gov", ".org"]):
-            score += 0.3
-        if "arxiv.org" in url or "pubmed" in url:
-            score += 0.2
-        if any(domain in url for domain in [".com", ".net"]):
-            score += 0.1
-        
-        # Content quality indicators
-        if any(word in content for word in ["study", "research", "analysis", "data"]):
-            score += 0.1
-        if any(word in title for word in ["study", "research", "analysis"]):
-            score += 0.1
-        
-        # Length indicates depth
-        if len(content) > 500:
-            score += 0.1
-        
-        return min(score, 1.0)
+        return self.scorer.score(source)
 
 # Fallback search implementation
 class FallbackSearcher:
@@ -0,0 +1,52 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from core.metrics import current_trace_id, traced_context
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key onto a single in-flight task.
+
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same task and receive its result (or exception).
+    The task is shielded so one caller's cancellation does not abort the work
+    the other callers are waiting on. The work runs under the first caller's
+    trace id; callers that join it log that id so their traces can be linked.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, Tuple[asyncio.Task, str]] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        flight = self._inflight.get(key)
+        if flight is None:
+            trace_id = current_trace_id.get()
+            task = asyncio.get_running_loop().create_task(factory(), context=traced_context(trace_id))
+            self._inflight[key] = (task, trace_id)
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            task, trace_id = flight
+            self.coalesced += 1
+            logger.debug(f"Joined in-flight work started under trace {trace_id}")
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        flight = self._inflight.get(key)
+        if flight is not None and flight[0] is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every caller has gone away
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'in_flight': len(self._inflight),
+            'calls': self.calls,
+            'coalesced': self.coalesced
+        }
@@ -0,0 +1,170 @@
+"""
+Persistent store for compiled research reports.
+
+Reports are kept in SQLite (WAL mode) and indexed by normalized topic,
+creation time and source URL so past reports can be listed and fetched
+without rerunning the pipeline.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from core.cache import normalize_topic
+from core.summarizer import summary_cache_key
+from models.schemas import ResearchReport
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    topic TEXT NOT NULL,
+    normalized_topic TEXT NOT NULL,
+    max_sources INTEGER,
+    created_at TEXT NOT NULL,
+    report TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reports_topic_created ON reports(normalized_topic, created_at DESC);
+CREATE INDEX IF NOT EXISTS reports_created ON reports(created_at DESC);
+
+CREATE TABLE IF NOT EXISTS report_sources (
+    report_id INTEGER NOT NULL REFERENCES reports(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    PRIMARY KEY (report_id, position)
+);
+CREATE INDEX IF NOT EXISTS report_sources_url ON report_sources(url);
+"""
+
+
+def _stored_time(value: datetime) -> str:
+    """``value`` in the stored created_at format: naive local time, ISO 8601."""
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.isoformat()
+
+
+class ReportStore:
+    """SQLite-backed archive of research reports."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def save(self, report: ResearchReport, sources: List[Dict[str, Any]], max_sources: Optional[int] = None) -> int:
+        """Persist a report with the sources it was built from; returns its id."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO reports (topic, normalized_topic, max_sources, created_at, report) VALUES (?, ?, ?, ?, ?)",
+                (report.topic, normalize_topic(report.topic), max_sources,
+                 _stored_time(report.timestamp), report.model_dump_json())
+            )
+            report_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO report_sources (report_id, position, url, content_hash) VALUES (?, ?, ?, ?)",
+                [(report_id, position, source.get('url', ''), summary_cache_key(source))
+                 for position, source in enumerate(sources)]
+            )
+        return report_id
+
+    def get(self, report_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM reports WHERE id = ?", (report_id,)).fetchone()
+            if row is None:
+                return None
+            return self._record(row, include_report=True)
+
+    def latest(self, topic: str, max_sources: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Most recent report for a topic (and source count, when given)."""
+        query = "SELECT * FROM reports WHERE normalized_topic = ?"
+        params: List[Any] = [normalize_topic(topic)]
+        if max_sources is not None:
+            query += " AND max_sources = ?"
+            params.append(max_sources)
+        with self._lock:
+            row = self._conn.execute(query + " ORDER BY created_at DESC LIMIT 1", params).fetchone()
+            if row is None:
+                return None
+            return self._record(row, include_report=True)
+
+    def list(self, topic: Optional[str] = None, url: Optional[str] = None,
+             since: Optional[datetime] = None, until: Optional[datetime] = None,
+             offset: int = 0, limit: int = 20) -> Tuple[List[Dict[str, Any]], int]:
+        """Page through stored reports, newest first; returns (records, total matches)."""
+        clauses, params = [], []
+        if topic:
+            clauses.append("normalized_topic = ?")
+            params.append(normalize_topic(topic))
+        if url:
+            clauses.append("id IN (SELECT report_id FROM report_sources WHERE url = ?)")
+            params.append(url)
+        if since:
+            clauses.append("created_at >= ?")
+            params.append(_stored_time(since))
+        if until:
+            clauses.append("created_at < ?")
+            params.append(_stored_time(until))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            (total,) = self._conn.execute(f"SELECT COUNT(*) FROM reports{where}", params).fetchone()
+            # One query for the page and its source URLs, grouped back into records below
+            rows = self._conn.execute(
+                "SELECT page.id, page.topic, page.max_sources, page.created_at, report_sources.url FROM "
+                f"(SELECT id, topic, max_sources, created_at FROM reports{where} "
+                "ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?) AS page "
+                "LEFT JOIN report_sources ON report_sources.report_id = page.id "
+                "ORDER BY page.created_at DESC, page.id DESC, report_sources.position",
+                params + [limit, offset]
+            ).fetchall()
+
+        records: Dict[int, Dict[str, Any]] = {}
+        for row in rows:
+            record = records.get(row['id'])
+            if record is None:
+                record = records[row['id']] = {
+                    'id': row['id'],
+                    'topic': row['topic'],
+                    'max_sources': row['max_sources'],
+                    'created_at': row['created_at'],
+                    'source_urls': []
+                }
+            if row['url'] is not None:
+                record['source_urls'].append(row['url'])
+        return list(records.values()), total
+
+    def sources(self, report_id: int) -> List[Dict[str, str]]:
+        """Source URLs and content hashes a stored report was built from, in order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, content_hash FROM report_sources WHERE report_id = ? ORDER BY position", (report_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _record(self, row: sqlite3.Row, include_report: bool = False) -> Dict[str, Any]:
+        record = {
+            'id': row['id'],
+            'topic': row['topic'],
+            'max_sources': row['max_sources'],
+            'created_at': row['created_at'],
+            'source_urls': [
+                url for (url,) in self._conn.execute(
+                    "SELECT url FROM report_sources WHERE report_id = ? ORDER BY position", (row['id'],)
+                )
+            ]
+        }
+        if include_report:
+            record['report'] = json.loads(row['report'])
+        return record
+
+    def close(self):
+        self._conn.close()
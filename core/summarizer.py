@@ -1,20 +1,42 @@
 import os
-from typing import List, Dict, Any
+import asyncio
+import hashlib
+from typing import List, Dict, Any, Optional, Set, Tuple
 # Removed LangChain dependencies for demo mode compatibility
 import logging
 
+from core.scheduler import scheduler, estimate_tokens
+from core.parsing import parse_summary, split_batch_response, SUMMARY_FIELDS
+from core.metrics import SUMMARIZED_SOURCES
+from core.prompts import PromptBuilder
+from models.schemas import SourceSummary
+
 logger = logging.getLogger(__name__)
 
-class AISummarizer:
-    def __init__(self):
-        # Placeholder for real AI implementation
-        # In demo mode, this won't be used
-        pass
-    
-    async def summarize_source(self, source: Dict[str, Any]) -> Dict[str, str]:
-        """Summarize a single source with structured analysis."""
-        
-        system_prompt = """You are an expert research analyst. Your task is to analyze and summarize research sources with precision and clarity.
+# Bump whenever the summarization prompt changes so cached summaries are not reused
+SUMMARY_PROMPT_VERSION = "2"
+# Estimated tokens of source content in the prompt; part of the cache key since it changes the prompt
+SUMMARY_SOURCE_TOKENS = int(os.getenv("SUMMARY_SOURCE_TOKENS", "400"))
+
+def summary_cache_key(source: Dict[str, Any]) -> str:
+    """Content-addressed cache key for a source's summary."""
+    digest = hashlib.sha256()
+    for part in (source.get('title', ''), source.get('url', ''), source.get('content', ''),
+                 SUMMARY_PROMPT_VERSION, SUMMARY_SOURCE_TOKENS):
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+async def get_cached_summary(cache, source: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Look up a source in a summary cache, keeping the source's current credibility score."""
+    if cache is None:
+        return None
+    cached = await cache.aget(summary_cache_key(source))
+    if cached is None:
+        return None
+    return {**cached, 'credibility_score': source.get('credibility_score', cached['credibility_score'])}
+
+SYSTEM_PROMPT = """You are an expert research analyst. Your task is to analyze and summarize research sources with precision and clarity.
 
 For each source, provide:
 1. A concise summary (under 100 words)
@@ -24,60 +46,180 @@ For each source, provide:
 
 Be factual, avoid speculation, and focus on verifiable information."""
 
+SUMMARY_FORMAT = """- Summary: [under 100 words]
+- Core Argument: [main finding or thesis]
+- Evidence Used: [data, methodology, or supporting information]
+- Conclusion: [author's main implication or takeaway]"""
+
+# Sources waiting for a batched call: the source, its compressed content and the caller's future
+PendingSource = Tuple[Dict[str, Any], str, asyncio.Future]
+
+
+class AISummarizer:
+    def __init__(self, summary_cache=None, prompt_builder: Optional[PromptBuilder] = None,
+                 batch_tokens: int = 0, max_batch_sources: int = 8, batch_window: float = 0.01):
+        # Placeholder for real AI implementation
+        # In demo mode, this won't be used
+        self.summary_cache = summary_cache
+        self.prompt_builder = prompt_builder or PromptBuilder(source_tokens=SUMMARY_SOURCE_TOKENS)
+        # batch_tokens > 0 packs concurrent summarize_source calls into shared requests of about that many prompt tokens
+        self.batch_tokens = batch_tokens
+        self.max_batch_sources = max_batch_sources
+        self.batch_window = batch_window
+        self._pending: List[PendingSource] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        # The event loop only keeps weak references to tasks; hold flushes until they finish
+        self._flushes: Set[asyncio.Task] = set()
+    
+    async def summarize_source(self, source: Dict[str, Any]) -> Dict[str, str]:
+        """Summarize a single source with structured analysis.
+        
+        With batching enabled, sources requested within ``batch_window`` of
+        each other are summarized together in as few calls as the token budget allows.
+        """
+        cached = await get_cached_summary(self.summary_cache, source)
+        if cached is not None:
+            return cached
+        
+        content = self.prompt_builder.source_content(source)
+        if self.batch_tokens <= 0:
+            return await self._summarize_single(source, content)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((source, content, future))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_after(self.batch_window))
+            self._flushes.add(self._flush_task)
+            self._flush_task.add_done_callback(self._flushes.discard)
+        return await future
+    
+    async def _summarize_single(self, source: Dict[str, Any], content: str, mode: str = 'single') -> Dict[str, str]:
+        """One LLM call for one source; ``mode`` labels the call in SUMMARIZED_SOURCES."""
         human_prompt = f"""
 Analyze this research source:
 
 Title: {source.get('title', 'N/A')}
 URL: {source.get('url', 'N/A')}
-Content: {source.get('content', 'N/A')[:2000]}...
+Content: {content or 'N/A'}
 
 Provide a structured analysis following the format:
-- Summary: [under 100 words]
-- Core Argument: [main finding or thesis]
-- Evidence Used: [data, methodology, or supporting information]
-- Conclusion: [author's main implication or takeaway]
+{SUMMARY_FORMAT}
 """
 
         try:
-            # This is a placeholder - in demo mode, mock AI is used instead
-            return self._fallback_summary(source)
-            
+            SUMMARIZED_SOURCES.inc(mode=mode)
+            response = await self._complete(SYSTEM_PROMPT, human_prompt)
         except Exception as e:
             logger.error(f"Summarization error: {str(e)}")
             return self._fallback_summary(source)
+        
+        if not response:
+            # Fallbacks are never cached so the next request gets a real attempt
+            return self._fallback_summary(source)
+        result = self._parse_summary_response(response, source).model_dump()
+        self._store(source, result)
+        return result
     
-    def _parse_summary_response(self, response: str, source: Dict) -> Dict[str, str]:
-        """Parse the LLM response into structured components."""
-        lines = response.strip().split('\n')
-        result = {
-            'title': source.get('title', 'N/A'),
-            'url': source.get('url', 'N/A'),
-            'summary': '',
-            'core_argument': '',
-            'evidence_used': '',
-            'conclusion': '',
-            'credibility_score': source.get('credibility_score', 0.7)
-        }
+    async def _flush_after(self, delay: float):
+        """Summarize everything queued during ``delay`` in token-budgeted batches."""
+        await asyncio.sleep(delay)
+        self._flush_task = None
+        pending, self._pending = self._pending, []
+        batches = self._pack(pending)
+        outcomes = await asyncio.gather(*(self._summarize_batch(batch) for batch in batches), return_exceptions=True)
+        for batch, outcome in zip(batches, outcomes):
+            if isinstance(outcome, BaseException):
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(outcome)
+    
+    def _pack(self, pending: List[PendingSource]) -> List[List[PendingSource]]:
+        """Group queued sources, in arrival order, into batches that fit the prompt token budget."""
+        overhead = estimate_tokens(SYSTEM_PROMPT + SUMMARY_FORMAT) + 100
+        batches: List[List[PendingSource]] = []
+        batch: List[PendingSource] = []
+        used = overhead
+        for item in pending:
+            source, content, _ = item
+            cost = estimate_tokens(f"{source.get('title', '')} {source.get('url', '')} {content}") + 15
+            if batch and (used + cost > self.batch_tokens or len(batch) >= self.max_batch_sources):
+                batches.append(batch)
+                batch, used = [], overhead
+            batch.append(item)
+            used += cost
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    async def _summarize_batch(self, batch: List[PendingSource]):
+        """Summarize several sources in one call; sources whose section cannot be parsed are retried alone."""
+        batch = [item for item in batch if not item[2].done()]
+        if len(batch) <= 1:
+            for source, content, future in batch:
+                self._settle(future, await self._summarize_single(source, content))
+            return
         
-        current_section = None
-        for line in lines:
-            line = line.strip()
-            if line.startswith('- Summary:'):
-                current_section = 'summary'
-                result['summary'] = line.replace('- Summary:', '').strip()
-            elif line.startswith('- Core Argument:'):
-                current_section = 'core_argument'
-                result['core_argument'] = line.replace('- Core Argument:', '').strip()
-            elif line.startswith('- Evidence Used:'):
-                current_section = 'evidence_used'
-                result['evidence_used'] = line.replace('- Evidence Used:', '').strip()
-            elif line.startswith('- Conclusion:'):
-                current_section = 'conclusion'
-                result['conclusion'] = line.replace('- Conclusion:', '').strip()
-            elif current_section and line and not line.startswith('-'):
-                result[current_section] += ' ' + line
+        blocks = '\n'.join(
+            f"=== SOURCE {number} ===\nTitle: {source.get('title', 'N/A')}\nURL: {source.get('url', 'N/A')}\n"
+            f"Content: {content or 'N/A'}\n"
+            for number, (source, content, _) in enumerate(batch, 1)
+        )
+        human_prompt = f"""
+Analyze each of these {len(batch)} research sources separately:
+
+{blocks}
+For every source, start a section with its delimiter line, "=== SUMMARY <number> ===", followed by a structured analysis in the format:
+{SUMMARY_FORMAT}
+"""
+
+        try:
+            SUMMARIZED_SOURCES.inc(len(batch), mode='batched')
+            response = await self._complete(SYSTEM_PROMPT, human_prompt)
+        except Exception as e:
+            logger.error(f"Batched summarization error: {str(e)}")
+            retry = batch
+        else:
+            sections = split_batch_response(response) if response else {}
+            retry = []
+            for number, (source, content, future) in enumerate(batch, 1):
+                if not response:
+                    self._settle(future, self._fallback_summary(source))
+                    continue
+                section = sections.get(number)
+                summary = self._parse_summary_response(section, source) if section else None
+                if summary is None or not any(getattr(summary, field) for field in SUMMARY_FIELDS):
+                    retry.append((source, content, future))
+                    continue
+                result = summary.model_dump()
+                self._store(source, result)
+                self._settle(future, result)
         
-        return result
+        if retry:
+            logger.warning(f"Summarizing {len(retry)} of {len(batch)} batched sources individually")
+            results = await asyncio.gather(*(self._summarize_single(source, content, mode='retry')
+                                             for source, content, _ in retry))
+            for (_, _, future), result in zip(retry, results):
+                self._settle(future, result)
+    
+    @staticmethod
+    def _settle(future: asyncio.Future, result: Dict[str, Any]):
+        # The caller may have been cancelled while its batch was in flight
+        if not future.done():
+            future.set_result(result)
+    
+    def _store(self, source: Dict[str, Any], result: Dict[str, Any]):
+        if self.summary_cache is not None:
+            self.summary_cache.set(summary_cache_key(source), result)
+    
+    async def _complete(self, system_prompt: str, human_prompt: str) -> Optional[str]:
+        """Run one LLM call under the shared scheduler; None until a model is wired in."""
+        async with scheduler.slot('llm', tokens=estimate_tokens(system_prompt + human_prompt)):
+            # This is a placeholder - in demo mode, mock AI is used instead
+            return None
+    
+    def _parse_summary_response(self, response: str, source: Dict) -> SourceSummary:
+        """Parse the LLM response (sectioned text or JSON mode) into a SourceSummary."""
+        return parse_summary(response, source)
     
     def _fallback_summary(self, source: Dict) -> Dict[str, str]:
         """Provide a basic summary when AI processing fails."""
@@ -111,15 +253,16 @@ Format as a numbered list.
 """
 
         try:
-            # Return default reasoning steps for demo mode
-            return [
-                "1. Evaluate source credibility based on domain authority and content quality",
-                "2. Identify common themes and arguments across sources",
-                "3. Extract key evidence and data points from each source",
-                "4. Compare findings to identify agreements and contradictions",
-                "5. Synthesize unique insights from cross-source analysis",
-                "6. Formulate actionable takeaways based on synthesized findings"
-            ]
+            async with scheduler.slot('llm', tokens=estimate_tokens(system_prompt + human_prompt)):
+                # Return default reasoning steps for demo mode
+                return [
+                    "1. Evaluate source credibility based on domain authority and content quality",
+                    "2. Identify common themes and arguments across sources",
+                    "3. Extract key evidence and data points from each source",
+                    "4. Compare findings to identify agreements and contradictions",
+                    "5. Synthesize unique insights from cross-source analysis",
+                    "6. Formulate actionable takeaways based on synthesized findings"
+                ]
             
         except Exception as e:
             logger.error(f"Reasoning generation error: {str(e)}")
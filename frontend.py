@@ -2,7 +2,6 @@ import streamlit as st
 import requests
 import json
 from datetime import datetime
-import time
 
 # Page configuration
 st.set_page_config(
@@ -74,6 +73,33 @@ def call_research_api(topic: str, max_sources: int = 3):
         st.error(f"API Error: {str(e)}")
         return None
 
+def stream_research_api(topic: str, max_sources: int = 3, on_event=None):
+    """Call the streaming research API, reporting each stage event as it arrives."""
+    try:
+        with requests.post(
+            f"{API_BASE_URL}/research/stream",
+            json={"topic": topic, "max_sources": max_sources},
+            stream=True,
+            timeout=120
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event["event"] == "error":
+                    st.error(f"API Error: {event['detail']}")
+                    return None
+                if on_event:
+                    on_event(event)
+                if event["event"] == "report":
+                    return event["data"]
+        return None
+    except requests.exceptions.RequestException as e:
+        # Backends without the streaming endpoint, or a dropped stream: fall back to a single request
+        st.warning(f"Live progress unavailable ({str(e)}); waiting for the full report instead")
+        return call_research_api(topic, max_sources)
+
 def format_confidence_level(level: str) -> str:
     """Format confidence level with appropriate styling."""
     class_name = f"confidence-{level.lower()}"
@@ -167,23 +193,26 @@ def main():
             progress_bar = st.progress(0)
             status_text = st.empty()
             
-            # Simulate progress updates
-            for i in range(5):
-                progress_bar.progress((i + 1) * 20)
-                if i == 0:
-                    status_text.text("Searching for credible sources...")
-                elif i == 1:
-                    status_text.text("Analyzing source credibility...")
-                elif i == 2:
-                    status_text.text("Generating AI summaries...")
-                elif i == 3:
-                    status_text.text("Extracting cross-insights...")
-                elif i == 4:
+            # Track progress from the streamed stage events
+            progress = {"summaries": 0, "total": max_sources}
+            
+            def on_event(event):
+                if event["event"] == "sources":
+                    progress["total"] = len(event["data"])
+                    progress_bar.progress(20)
+                    status_text.text(f"Found {progress['total']} credible sources. Generating AI summaries...")
+                elif event["event"] == "summary":
+                    progress["summaries"] += 1
+                    progress_bar.progress(20 + int(60 * progress["summaries"] / max(progress["total"], 1)))
+                    status_text.text(f"Summarized {progress['summaries']}/{progress['total']}: {event['data']['title']}")
+                    if progress["summaries"] == progress["total"]:
+                        status_text.text("Extracting cross-insights...")
+                elif event["event"] == "insights":
+                    progress_bar.progress(95)
                     status_text.text("Compiling final report...")
-                time.sleep(0.5)
             
-            # Make API call
-            result = call_research_api(topic, max_sources)
+            status_text.text("Searching for credible sources...")
+            result = stream_research_api(topic, max_sources, on_event=on_event)
             
             # Clear progress indicators
             progress_bar.empty()
@@ -1,23 +1,42 @@
 import os
+import json
+import time
 import asyncio
 from datetime import datetime
-from typing import List
-from fastapi import FastAPI, HTTPException
+from typing import List, Optional
+from fastapi import FastAPI, HTTPException, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from dotenv import load_dotenv
 import logging
 
-from models.schemas import ResearchRequest, ResearchReport, HealthCheck, SourceSummary, CrossInsight
+from models.schemas import (
+    ResearchRequest, ResearchReport, HealthCheck, BatchResearchRequest, ResearchJob,
+    StoredReport, StoredReportPage
+)
 from core.search import WebSearcher, FallbackSearcher
-from core.summarizer import AISummarizer
+from core.federated import FederatedSearcher, build_providers
+from core.summarizer import AISummarizer, SUMMARY_SOURCE_TOKENS
 from core.insights import InsightGenerator
-from core.mock_ai import MockAISummarizer, MockInsightGenerator
+from core.prompts import PromptBuilder
+from core.mock_ai import MockAISummarizer, MockInsightGenerator, LatencyModel
+from core.pipeline import ResearchPipeline, NoSourcesError
+from core.cache import TTLCache, SQLiteCache, TieredCache, StaleWhileRevalidateCache
+from core.batch import BatchRunner
+from core.store import ReportStore
+from core.fetcher import ContentFetcher
+from core.scheduler import scheduler
+from core.jobs import JobManager, JobQueueFullError
+from core.loop_monitor import LoopMonitor
+from core.metrics import metrics, current_trace_id, new_trace_id, TraceIdFilter, HTTP_REQUEST_SECONDS, HTTP_IN_FLIGHT
 
 # Load environment variables
 load_dotenv()
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s:[%(trace_id)s] %(message)s")
+for handler in logging.getLogger().handlers:
+    handler.addFilter(TraceIdFilter())
 logger = logging.getLogger(__name__)
 
 # Initialize FastAPI app
@@ -36,19 +55,210 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-source summary cache shared across requests, keyed by content hash
+summary_cache = TieredCache(
+    TTLCache(
+        max_entries=int(os.getenv("SUMMARY_CACHE_SIZE", "1024")),
+        ttl=float(os.getenv("SUMMARY_CACHE_TTL", "86400"))
+    ),
+    SQLiteCache(
+        os.getenv("SUMMARY_CACHE_DB"),
+        max_entries=int(os.getenv("SUMMARY_CACHE_DB_SIZE", "50000")),
+        ttl=float(os.getenv("SUMMARY_CACHE_DB_TTL", "604800")),
+        table="summaries"
+    ) if os.getenv("SUMMARY_CACHE_DB") else None
+)
+
 # Initialize components - use mock versions if no API keys available
 use_mock_ai = not os.getenv("ANTHROPIC_API_KEY") or os.getenv("ANTHROPIC_API_KEY") == "your_anthropic_api_key_here"
 
 if use_mock_ai:
     logger.info("🎭 Using mock AI for demo purposes (no API keys required)")
-    summarizer = MockAISummarizer()
-    insight_generator = MockInsightGenerator()
+    latency_model = LatencyModel.from_env()
+    summarizer = MockAISummarizer(summary_cache=summary_cache, latency_model=latency_model)
+    insight_generator = MockInsightGenerator(latency_model=latency_model)
 else:
     logger.info("🤖 Using real AI with API keys")
-    summarizer = AISummarizer()
-    insight_generator = InsightGenerator()
+    # Source content and summaries are compressed to these token budgets before prompting
+    prompt_builder = PromptBuilder(
+        source_tokens=SUMMARY_SOURCE_TOKENS,
+        summaries_tokens=int(os.getenv("INSIGHT_MAX_PROMPT_TOKENS", "6000")),
+        min_summary_tokens=int(os.getenv("INSIGHT_MIN_SOURCE_TOKENS", "80"))
+    )
+    summarizer = AISummarizer(
+        summary_cache=summary_cache,
+        prompt_builder=prompt_builder,
+        batch_tokens=int(os.getenv("SUMMARY_BATCH_TOKENS", "0")),
+        max_batch_sources=int(os.getenv("SUMMARY_BATCH_MAX_SOURCES", "8")),
+        batch_window=float(os.getenv("SUMMARY_BATCH_WINDOW", "0.01"))
+    )
+    insight_generator = InsightGenerator(
+        map_reduce=os.getenv("INSIGHT_MAP_REDUCE", "auto"),
+        fanout=int(os.getenv("INSIGHT_FANOUT", "0")),
+        max_prompt_tokens=prompt_builder.summaries_tokens,
+        prompt_builder=prompt_builder
+    )
+
+# SEARCH_PROVIDERS (e.g. "tavily,stub") federates several providers; otherwise Tavily or the fallback
+tavily_configured = os.getenv("TAVILY_API_KEY") not in (None, "", "your_tavily_api_key_here", "demo_mode")
+search_providers = build_providers(
+    [name.strip() for name in os.getenv("SEARCH_PROVIDERS", "").split(",") if name.strip()],
+    # Synthetic stub results must never mix into real search results outside demo mode
+    allow_stubs=not tavily_configured or os.getenv("SEARCH_ALLOW_STUBS") == "1"
+)
+if search_providers:
+    logger.info(f"🔎 Federated search over: {', '.join(p.name for p in search_providers)}")
+    searcher = FederatedSearcher(
+        search_providers,
+        fanout=int(os.getenv("SEARCH_FANOUT")) if os.getenv("SEARCH_FANOUT") else None,
+        timeout=float(os.getenv("SEARCH_TIMEOUT", "30")),
+        hedge_percentile=float(os.getenv("SEARCH_HEDGE_PERCENTILE", "95")),
+        hedge_after=float(os.getenv("SEARCH_HEDGE_AFTER", "1.0")),
+        failure_threshold=int(os.getenv("SEARCH_BREAKER_FAILURES", "3")),
+        reset_timeout=float(os.getenv("SEARCH_BREAKER_RESET", "30"))
+    )
+else:
+    searcher = WebSearcher() if tavily_configured else FallbackSearcher()
+
+# Report cache: in-process LRU, plus an on-disk tier when REPORT_CACHE_DB is set
+report_cache = TieredCache(
+    TTLCache(
+        max_entries=int(os.getenv("REPORT_CACHE_SIZE", "128")),
+        ttl=float(os.getenv("REPORT_CACHE_TTL", "3600"))
+    ),
+    SQLiteCache(
+        os.getenv("REPORT_CACHE_DB"),
+        max_entries=int(os.getenv("REPORT_CACHE_DB_SIZE", "10000")),
+        ttl=float(os.getenv("REPORT_CACHE_DB_TTL", "86400")),
+        table="reports"
+    ) if os.getenv("REPORT_CACHE_DB") else None
+)
 
-searcher = WebSearcher() if os.getenv("TAVILY_API_KEY") and os.getenv("TAVILY_API_KEY") != "your_tavily_api_key_here" else FallbackSearcher()
+# Persistent archive of every compiled report; like the other disk tiers it is opt-in, as it has no retention limit
+report_store = ReportStore(os.getenv("REPORT_STORE_DB")) if os.getenv("REPORT_STORE_DB") else None
+
+# Search results change slowly: serve them from memory and refresh stale entries in the background
+search_cache = StaleWhileRevalidateCache(
+    max_entries=int(os.getenv("SEARCH_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", "600")),
+    stale_ttl=float(os.getenv("SEARCH_CACHE_STALE_TTL", "3600")),
+    negative_ttl=float(os.getenv("SEARCH_CACHE_NEGATIVE_TTL", "60"))
+)
+
+# Optional full-text fetch stage: summarize page text instead of the search snippet
+fetcher = ContentFetcher(
+    max_concurrency=int(os.getenv("FETCH_MAX_CONCURRENCY", "8")),
+    timeout=float(os.getenv("FETCH_TIMEOUT", "10")),
+    max_bytes=int(os.getenv("FETCH_MAX_BYTES", "2000000")),
+    max_chars=int(os.getenv("FETCH_MAX_CHARS", "8000")),
+    fresh_for=float(os.getenv("FETCH_FRESH_FOR", "3600")),
+    cache=TTLCache(
+        max_entries=int(os.getenv("FETCH_CACHE_SIZE", "512")),
+        ttl=float(os.getenv("FETCH_CACHE_TTL", "86400"))
+    )
+) if os.getenv("FETCH_FULL_TEXT") == "1" else None
+
+pipeline = ResearchPipeline(
+    searcher, summarizer, insight_generator, report_cache=report_cache, report_store=report_store,
+    search_cache=search_cache, fetcher=fetcher
+)
+
+jobs = JobManager(
+    pipeline,
+    max_workers=int(os.getenv("JOB_MAX_WORKERS", "2")),
+    max_queued=int(os.getenv("JOB_MAX_QUEUED", "100")),
+    ttl=float(os.getenv("JOB_TTL", "3600")),
+    max_retained=int(os.getenv("JOB_MAX_RETAINED", "1000"))
+)
+
+def collect_runtime_metrics():
+    """Point-in-time samples for caches, in-flight work, scheduler queues and jobs."""
+    for name, metric_type, help, key in (
+        ("insightsynth_cache_hits_total", "counter", "Cache hits", "hits"),
+        ("insightsynth_cache_misses_total", "counter", "Cache misses", "misses"),
+        ("insightsynth_cache_evictions_total", "counter", "Cache evictions", "evictions"),
+        ("insightsynth_cache_hit_ratio", "gauge", "Cache hit ratio since start", "hit_rate"),
+        ("insightsynth_cache_entries", "gauge", "Entries currently cached", "size"),
+    ):
+        samples = []
+        for cache_name, cache in (("reports", report_cache), ("summaries", summary_cache), ("search", search_cache)):
+            for tier, tier_stats in cache.stats().items():
+                if tier_stats is not None:
+                    samples.append(({"cache": cache_name, "tier": tier}, tier_stats[key]))
+        yield name, metric_type, help, samples
+    
+    flights = pipeline.stats()
+    yield ("insightsynth_in_flight", "gauge", "Distinct pipeline calls currently in flight",
+           [({"level": level}, s["in_flight"]) for level, s in flights.items()])
+    yield ("insightsynth_coalesced_calls_total", "counter", "Calls served by joining an identical in-flight call",
+           [({"level": level}, s["coalesced"]) for level, s in flights.items()])
+    
+    providers = scheduler.stats()
+    yield ("insightsynth_provider_calls_in_use", "gauge", "Outbound calls currently holding a provider slot",
+           [({"provider": p}, s["in_use"]) for p, s in providers.items()])
+    yield ("insightsynth_provider_queue_depth", "gauge", "Outbound calls waiting for a provider slot",
+           [({"provider": p, "priority": prio}, depth) for p, s in providers.items() for prio, depth in s["queue_depth"].items()])
+    yield ("insightsynth_provider_calls_total", "counter", "Outbound calls admitted per provider",
+           [({"provider": p}, s["calls"]) for p, s in providers.items()])
+    yield ("insightsynth_provider_throttled_total", "counter", "Outbound calls delayed by a rate limit",
+           [({"provider": p}, s["throttled_calls"]) for p, s in providers.items()])
+    
+    job_stats = jobs.stats()
+    yield ("insightsynth_job_queue_depth", "gauge", "Background jobs waiting for a worker", [({}, job_stats["queued"])])
+    yield ("insightsynth_jobs", "gauge", "Retained background jobs by status",
+           [({"status": status}, count) for status, count in job_stats["jobs"].items()])
+
+metrics.add_collector(collect_runtime_metrics)
+
+# Opt-in event-loop health monitoring (lag percentiles and blocking-call stacks)
+loop_monitor = LoopMonitor(
+    interval=float(os.getenv("LOOP_MONITOR_INTERVAL", "0.05")),
+    threshold=float(os.getenv("LOOP_MONITOR_THRESHOLD", "0.1"))
+)
+metrics.add_collector(loop_monitor.collect)
+
+@app.on_event("startup")
+async def startup():
+    """Start optional background monitors."""
+    if os.getenv("LOOP_MONITOR", "").lower() in ("1", "true", "yes"):
+        loop_monitor.start()
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Assign a trace id to each request and record its latency."""
+    trace_id = request.headers.get("X-Trace-Id") or new_trace_id()
+    current_trace_id.set(trace_id)
+    HTTP_IN_FLIGHT.inc()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers["X-Trace-Id"] = trace_id
+        return response
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            path=route.path if route is not None else "unmatched",
+            status=status
+        )
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Release worker pools held by the pipeline components."""
+    await jobs.stop()
+    await loop_monitor.stop()
+    if hasattr(searcher, "close"):
+        searcher.close()
+    if fetcher is not None:
+        await fetcher.close()
+    report_cache.close()
+    summary_cache.close()
+    if report_store is not None:
+        report_store.close()
 
 @app.get("/", response_model=HealthCheck)
 async def health_check():
@@ -58,69 +268,147 @@ async def health_check():
         timestamp=datetime.now()
     )
 
+def apply_cache_control(request: ResearchRequest, header: Optional[str]):
+    """Honour a Cache-Control request header when the body does not set the flag."""
+    if request.cache_control is None and header:
+        directives = {d.strip().lower() for d in header.split(',')}
+        if 'no-store' in directives:
+            request.cache_control = 'no-store'
+        elif 'no-cache' in directives:
+            request.cache_control = 'no-cache'
+
 @app.post("/research", response_model=ResearchReport)
-async def conduct_research(request: ResearchRequest):
+async def conduct_research(request: ResearchRequest, cache_control: Optional[str] = Header(None)):
     """Main research endpoint that orchestrates the entire workflow."""
+    apply_cache_control(request, cache_control)
+    
     try:
-        logger.info(f"Starting research for topic: {request.topic}")
-        
-        # Step 1: Search & Retrieval
-        logger.info("Step 1: Searching for sources...")
-        sources = await searcher.search_sources(request.topic, request.max_sources)
-        
-        if not sources:
-            raise HTTPException(status_code=404, detail="No credible sources found for the topic")
-        
-        logger.info(f"Found {len(sources)} sources")
-        
-        # Step 2: Generate reasoning steps
-        logger.info("Step 2: Generating reasoning steps...")
-        reasoning_steps = await summarizer.generate_reasoning_steps(request.topic, sources)
-        
-        # Step 3: Summarization
-        logger.info("Step 3: Summarizing sources...")
-        summarization_tasks = [summarizer.summarize_source(source) for source in sources]
-        summaries_data = await asyncio.gather(*summarization_tasks)
-        
-        # Convert to SourceSummary objects
-        article_summaries = [
-            SourceSummary(**summary_data) for summary_data in summaries_data
-        ]
-        
-        # Step 4: Insight Generation
-        logger.info("Step 4: Generating cross-insights...")
-        insights_data = await insight_generator.generate_cross_insights(request.topic, summaries_data)
-        
-        # Convert insights to proper format
-        cross_insights = [
-            CrossInsight(**insight) for insight in insights_data.get('cross_insights', [])
-        ]
-        
-        # Step 5: Compile Report
-        logger.info("Step 5: Compiling final report...")
-        report = ResearchReport(
-            topic=request.topic,
-            timestamp=datetime.now(),
-            article_summaries=article_summaries,
-            cross_insights=cross_insights,
-            key_takeaways=insights_data.get('key_takeaways', []),
-            contradictions=insights_data.get('contradictions', []),
-            emerging_trends=insights_data.get('emerging_trends', []),
-            reasoning_steps=reasoning_steps
-        )
-        
-        logger.info("Research completed successfully")
-        return report
-        
+        return await pipeline.run(request)
+    except NoSourcesError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         logger.error(f"Research error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Research failed: {str(e)}")
 
+@app.post("/research/stream")
+async def stream_research(request: ResearchRequest, cache_control: Optional[str] = Header(None)):
+    """Stream stage results as newline-delimited JSON events while research runs."""
+    apply_cache_control(request, cache_control)
+    
+    async def events():
+        try:
+            async for event in pipeline.stream(request):
+                yield json.dumps(event) + "\n"
+        except NoSourcesError as e:
+            yield json.dumps({"event": "error", "status": 404, "detail": str(e)}) + "\n"
+        except Exception as e:
+            logger.error(f"Research error: {str(e)}")
+            yield json.dumps({"event": "error", "status": 500, "detail": f"Research failed: {str(e)}"}) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@app.post("/research/batch")
+async def batch_research(batch: BatchResearchRequest):
+    """Run many topics on a shared worker pool, streaming each report as NDJSON as it finishes."""
+    runner = BatchRunner(pipeline, max_workers=batch.max_workers or int(os.getenv("BATCH_MAX_WORKERS", "4")))
+    
+    async def events():
+        async for event in runner.run(batch.requests):
+            yield json.dumps(event) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@app.post("/research/jobs", response_model=ResearchJob, status_code=202)
+async def submit_research_job(request: ResearchRequest, cache_control: Optional[str] = Header(None)):
+    """Queue a research run in the background and return its job id immediately."""
+    apply_cache_control(request, cache_control)
+    try:
+        return jobs.submit(request).to_dict()
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+
+@app.get("/research/jobs/{job_id}", response_model=ResearchJob)
+async def get_research_job(job_id: str):
+    """Poll a background research job for its status, partial results and final report."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job.to_dict()
+
+@app.get("/research/jobs")
+async def research_job_stats():
+    """Report job queue depth and job counts by status."""
+    return jobs.stats()
+
+@app.get("/reports", response_model=StoredReportPage)
+async def list_reports(
+    topic: Optional[str] = None,
+    url: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """List stored reports newest first, filtered by topic, source URL or time range."""
+    if report_store is None:
+        raise HTTPException(status_code=404, detail="Report store is disabled")
+    items, total = await asyncio.to_thread(report_store.list, topic, url, since, until, offset, limit)
+    return {"items": items, "total": total, "offset": offset, "limit": limit}
+
+@app.get("/reports/latest", response_model=StoredReport)
+async def latest_report(topic: str, max_sources: Optional[int] = None):
+    """Fetch the most recent stored report for a topic without rerunning the pipeline."""
+    record = await asyncio.to_thread(report_store.latest, topic, max_sources) if report_store is not None else None
+    if record is None:
+        raise HTTPException(status_code=404, detail="No stored report for this topic")
+    return record
+
+@app.get("/reports/{report_id}", response_model=StoredReport)
+async def get_report(report_id: int):
+    """Fetch a stored report by id."""
+    record = await asyncio.to_thread(report_store.get, report_id) if report_store is not None else None
+    if record is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    return record
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Expose stage latency histograms and runtime gauges in Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/loop")
+async def loop_health():
+    """Event-loop lag percentiles and recent stalls with the blocking stack."""
+    return loop_monitor.stats()
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Report cache hit/miss counters and sizes."""
+    return {
+        "reports": report_cache.stats(),
+        "summaries": summary_cache.stats(),
+        "search": search_cache.stats(),
+        "fetch": fetcher.stats() if fetcher is not None else None,
+        "in_flight": pipeline.stats()
+    }
+
+@app.get("/scheduler/stats")
+async def scheduler_stats():
+    """Report per-provider concurrency, queue depth and throttling counters."""
+    return scheduler.stats()
+
+@app.get("/search/stats")
+async def search_stats():
+    """Report per-provider circuit breaker state, latency and hedging counters."""
+    if not hasattr(searcher, "stats"):
+        return {"providers": {}}
+    return searcher.stats()
+
 @app.get("/sources/{topic}")
 async def get_sources_only(topic: str, max_sources: int = 3):
     """Get just the sources for a topic (useful for debugging)."""
     try:
-        sources = await searcher.search_sources(topic, max_sources)
+        sources = await pipeline.search_sources(topic, max_sources)
         return {"topic": topic, "sources": sources}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Source retrieval failed: {str(e)}")
@@ -1,10 +1,23 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 class ResearchRequest(BaseModel):
     topic: str = Field(..., description="The research topic to analyze")
     max_sources: Optional[int] = Field(3, description="Maximum number of sources to retrieve")
+    cache_control: Optional[str] = Field(
+        None,
+        pattern="^(no-cache|no-store)$",
+        description="'no-cache' reruns the pipeline and refreshes the cache; 'no-store' also skips caching the result"
+    )
+    incremental: bool = Field(
+        False,
+        description="Refresh the latest stored report, reprocessing only new or changed sources"
+    )
+
+class BatchResearchRequest(BaseModel):
+    requests: List[ResearchRequest] = Field(..., min_length=1, description="Research requests to run")
+    max_workers: Optional[int] = Field(None, ge=1, description="Concurrent topics (defaults to BATCH_MAX_WORKERS)")
 
 class SourceSummary(BaseModel):
     title: str
@@ -30,6 +43,32 @@ class ResearchReport(BaseModel):
     emerging_trends: List[str]
     reasoning_steps: List[str]
 
+class ResearchJob(BaseModel):
+    job_id: str
+    topic: str
+    status: str = Field(..., pattern="^(queued|running|completed|failed)$")
+    created_at: datetime
+    updated_at: datetime
+    partial: Dict[str, Any] = Field(default_factory=dict, description="Stage results available so far")
+    report: Optional[ResearchReport] = None
+    error: Optional[str] = None
+
+class StoredReportSummary(BaseModel):
+    id: int
+    topic: str
+    max_sources: Optional[int] = None
+    created_at: datetime
+    source_urls: List[str]
+
+class StoredReport(StoredReportSummary):
+    report: ResearchReport
+
+class StoredReportPage(BaseModel):
+    items: List[StoredReportSummary]
+    total: int
+    offset: int
+    limit: int
+
 class HealthCheck(BaseModel):
     status: str
     timestamp: datetime
\ No newline at end of file
@@ -0,0 +1,73 @@
+import time
+
+from core.cache import SQLiteCache, TieredCache, TTLCache
+
+
+def test_sqlite_cache_evicts_least_recently_used_above_bound(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"), max_entries=3)
+    for key in 'abc':
+        cache.set(key, {'key': key})
+    cache.set('a', {'key': 'a', 'updated': True})  # replacing a key does not grow the table
+    assert len(cache) == 3 and cache.evictions == 0
+
+    cache.get('b')
+    cache.set('d', {'key': 'd'})
+    assert len(cache) == 3
+    assert cache.get('c') is None
+    assert cache.get('b') == {'key': 'b'}
+    cache.close()
+
+
+def test_sqlite_cache_sweeps_expired_rows_before_evicting(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"), max_entries=2)
+    cache.set('old', 1, ttl=0.01)
+    cache.set('kept', 2)
+    time.sleep(0.02)
+    cache.set('new', 3)
+    assert cache.evictions == 0
+    assert cache.get('kept') == 2 and cache.get('new') == 3
+    assert len(cache) == 2
+    cache.close()
+
+
+def test_sqlite_cache_row_count_survives_reopen(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = SQLiteCache(path, max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.close()
+
+    reopened = SQLiteCache(path, max_entries=2)
+    reopened.set('c', 3)
+    assert len(reopened) == 2 and reopened.evictions == 1
+    reopened.close()
+
+
+def test_tiered_cache_writes_disk_in_background(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "cache.db"))
+    cache = TieredCache(TTLCache(max_entries=1), disk)
+    cache.set('a', {'v': 1})
+    cache.set('b', {'v': 2})
+    cache.delete('b')
+    cache.flush()
+    assert disk.get('a') == {'v': 1}
+    assert disk.get('b') is None
+    cache.close()
+
+
+def test_tiered_cache_aget_reads_disk_off_the_loop_and_promotes(tmp_path):
+    import asyncio
+    import threading
+
+    disk = SQLiteCache(str(tmp_path / "cache.db"))
+    disk.set('a', {'v': 1})
+    threads = []
+    original_get = disk.get
+    disk.get = lambda key: threads.append(threading.current_thread()) or original_get(key)
+    cache = TieredCache(TTLCache(), disk)
+
+    assert asyncio.run(cache.aget('a')) == {'v': 1}
+    assert threads and threads[0] is not threading.main_thread()
+    assert cache.memory.get('a') == {'v': 1}
+    assert disk.stats()['size'] == 1
+    cache.close()
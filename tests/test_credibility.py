@@ -0,0 +1,21 @@
+from benchmarks.bench_credibility import legacy_score, make_candidates
+from core.credibility import CredibilityScorer
+
+
+def test_scores_match_original_rule():
+    scorer = CredibilityScorer()
+    candidates = make_candidates(2000, seed=7, max_words=1500)
+    assert scorer.score_many(candidates) == [legacy_score(c) for c in candidates]
+
+
+def test_keyword_straddling_a_chunk_boundary_is_found():
+    scorer = CredibilityScorer()
+    content = 'x' * 1021 + 'RESEARCH' + ' filler' * 200
+    source = {'url': 'https://example.com/a', 'title': 'Notes', 'content': content}
+    assert scorer.score(source) == legacy_score(source)
+
+
+def test_negative_keyword_weight_still_applies_after_cap():
+    scorer = CredibilityScorer(weights={'content_keywords': -0.5})
+    source = {'url': 'https://arxiv.org/abs/1', 'title': 'Notes', 'content': 'some data'}
+    assert scorer.score(source) == 0.5
@@ -0,0 +1,105 @@
+import asyncio
+
+from core.federated import FederatedSearcher, CircuitBreaker, build_providers
+from core.search import SearchProvider, StubProvider, FallbackSources
+
+
+class EmptyProvider(SearchProvider):
+    def __init__(self, name):
+        self.name = name
+
+    async def search(self, query, max_results):
+        return []
+
+
+def test_providers_answering_with_no_results_is_not_a_failure():
+    searcher = FederatedSearcher([EmptyProvider('a'), EmptyProvider('b')])
+    sources = asyncio.run(searcher.search_sources('an obscure topic'))
+    assert sources == []
+    assert not isinstance(sources, FallbackSources)
+
+
+def test_mock_sources_only_when_no_provider_answers():
+    searcher = FederatedSearcher([StubProvider('stub-a', failure_rate=1.0), StubProvider('stub-b', failure_rate=1.0)])
+    sources = asyncio.run(searcher.search_sources('solar panels'))
+    assert isinstance(sources, FallbackSources)
+    assert sources
+
+
+def test_slow_provider_is_hedged_with_a_spare():
+    slow, spare = StubProvider('stub-slow', latency=1.0), StubProvider('stub-spare')
+    searcher = FederatedSearcher([slow, spare], fanout=1, hedge_after=0.05)
+
+    async def timed_search():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        sources = await searcher.search_sources('solar panels')
+        return sources, loop.time() - started
+
+    sources, elapsed = asyncio.run(timed_search())
+    assert elapsed < 0.5
+    assert searcher.hedges == 1
+    assert sources and all('stub-spare' in source['url'] for source in sources)
+    # Losing a hedge race is not a failure
+    assert searcher.breakers['stub-slow'].stats() == {'state': CircuitBreaker.CLOSED, 'failures': 0}
+
+
+def test_failed_provider_fails_over_to_spare():
+    broken, spare = StubProvider('stub-broken', failure_rate=1.0), StubProvider('stub-spare')
+    searcher = FederatedSearcher([broken, spare], fanout=1)
+    sources = asyncio.run(searcher.search_sources('solar panels'))
+    assert sources and all('stub-spare' in source['url'] for source in sources)
+    assert searcher.breakers['stub-broken'].failures == 1
+
+
+def test_breaker_opens_then_half_open_trial_closes_it():
+    provider = StubProvider('stub-flaky', failure_rate=1.0)
+    searcher = FederatedSearcher([provider], fanout=1, failure_threshold=2, reset_timeout=0.1)
+    breaker = searcher.breakers['stub-flaky']
+
+    async def scenario():
+        for _ in range(2):
+            await searcher.search_sources('solar panels')
+        assert breaker.state == CircuitBreaker.OPEN
+
+        # While open the provider is not called at all
+        calls = provider.calls
+        assert isinstance(await searcher.search_sources('solar panels'), FallbackSources)
+        assert provider.calls == calls
+
+        await asyncio.sleep(0.15)
+        provider.failure_rate = 0.0
+        sources = await searcher.search_sources('solar panels')
+        assert provider.calls == calls + 1
+        return sources
+
+    sources = asyncio.run(scenario())
+    assert sources and not isinstance(sources, FallbackSources)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_failure_reopens_and_allows_single_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_default_fanout_keeps_a_spare_for_hedging():
+    slow, spare = StubProvider('stub-slow', latency=1.0), StubProvider('stub-spare')
+    searcher = FederatedSearcher([slow, spare], hedge_after=0.05)
+    assert searcher.fanout == 1
+    sources = asyncio.run(searcher.search_sources('solar panels'))
+    assert searcher.hedges == 1
+    assert sources and all('stub-spare' in source['url'] for source in sources)
+
+
+def test_stub_providers_need_explicit_permission():
+    assert build_providers(['stub-a', 'stub-b']) == []
+    assert [p.name for p in build_providers(['stub-a', 'stub-b'], allow_stubs=True)] == ['stub-a', 'stub-b']
@@ -0,0 +1,120 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer as LocalServer
+
+from core.fetcher import ContentFetcher
+
+PARAGRAPHS = ''.join(f"<p>Paragraph {i} about solar panel efficiency measurements.</p>" for i in range(200))
+
+
+def make_app(requests):
+    async def article(request):
+        requests.append(request.path)
+        return web.Response(text=f"<html><nav>Menu</nav><body>{PARAGRAPHS}</body></html>", content_type='text/html')
+
+    async def unstructured(request):
+        # No paragraph markup until well past the byte cap
+        return web.Response(text="<div>" + "filler text " * 5000 + "</div><p>Late paragraph</p>", content_type='text/html')
+
+    async def slow(request):
+        await asyncio.sleep(1)
+        return web.Response(text="<p>Too late</p>", content_type='text/html')
+
+    async def tagged(request):
+        requests.append(request.headers.get('If-None-Match', ''))
+        if request.headers.get('If-None-Match') == '"v1"':
+            return web.Response(status=304, headers={'ETag': '"v1"'})
+        return web.Response(text="<p>Versioned page text.</p>", content_type='text/html', headers={'ETag': '"v1"'})
+
+    app = web.Application()
+    app.router.add_get('/article', article)
+    app.router.add_get('/unstructured', unstructured)
+    app.router.add_get('/slow', slow)
+    app.router.add_get('/tagged', tagged)
+    return app
+
+
+def run(scenario, **fetcher_options):
+    async def main():
+        requests = []
+        server = LocalServer(make_app(requests))
+        await server.start_server()
+        fetcher = ContentFetcher(**fetcher_options)
+        try:
+            return await scenario(fetcher, lambda path: str(server.make_url(path)), requests)
+        finally:
+            await fetcher.close()
+            await server.close()
+
+    return asyncio.run(main())
+
+
+def test_text_is_capped_at_max_chars():
+    async def scenario(fetcher, url, requests):
+        return await fetcher.fetch_text(url('/article'))
+
+    text = run(scenario, max_chars=500, chunk_size=256)
+    assert 0 < len(text) <= 500
+    assert text.startswith("Paragraph 0 about solar")
+    assert 'Menu' not in text and 'Paragraph 199' not in text
+
+
+def test_reading_stops_at_byte_cap():
+    async def scenario(fetcher, url, requests):
+        return await fetcher.fetch_text(url('/unstructured'))
+
+    text = run(scenario, max_bytes=2000, chunk_size=256)
+    assert text.startswith('filler text')
+    assert 'Late paragraph' not in text
+
+
+def test_slow_page_times_out():
+    async def scenario(fetcher, url, requests):
+        return await fetcher.fetch_text(url('/slow')), fetcher.failures
+
+    text, failures = run(scenario, timeout=0.2)
+    assert text is None and failures == 1
+
+
+def test_cached_page_is_revalidated_with_etag():
+    async def scenario(fetcher, url, requests):
+        first = await fetcher.fetch_text(url('/tagged'))
+        second = await fetcher.fetch_text(url('/tagged'))
+        return first, second, fetcher, requests
+
+    first, second, fetcher, requests = run(scenario, fresh_for=0)
+    assert first == second == 'Versioned page text.'
+    assert requests == ['', '"v1"']
+    assert fetcher.fetched == 1 and fetcher.not_modified == 1
+
+
+def test_fresh_cached_page_is_served_without_a_request():
+    async def scenario(fetcher, url, requests):
+        first = await fetcher.fetch_text(url('/tagged'))
+        second = await fetcher.fetch_text(url('/tagged'))
+        return first, second, requests
+
+    first, second, requests = run(scenario)
+    assert first == second == 'Versioned page text.'
+    assert requests == ['']
+
+
+def test_page_without_paragraph_markup_stops_at_text_cap():
+    async def scenario(fetcher, url, requests):
+        return await fetcher.fetch_text(url('/unstructured'))
+
+    text = run(scenario, max_chars=500, chunk_size=256)
+    assert text.startswith('filler text') and len(text) <= 500
+    # Reading stopped long before the paragraph at the end of the page
+    assert 'Late paragraph' not in text
+
+
+def test_enrich_keeps_snippet_when_page_cannot_be_fetched():
+    async def scenario(fetcher, url, requests):
+        sources = [{'url': url('/article'), 'content': 'short snippet'}, {'url': url('/slow'), 'content': 'kept'}]
+        return await fetcher.enrich(sources)
+
+    enriched = run(scenario, timeout=0.2)
+    assert enriched[0]['snippet'] == 'short snippet' and enriched[0]['content'].startswith('Paragraph 0')
+    assert enriched[1] == {'url': enriched[1]['url'], 'content': 'kept'}
@@ -0,0 +1,25 @@
+from core.insights import InsightGenerator, SYSTEM_PROMPT
+from core.scheduler import estimate_tokens
+
+
+def make_summaries(count, sentence_repeats):
+    text = ' '.join(f"Solar output rose {i}% in trial {i}." for i in range(sentence_repeats))
+    return [{'title': f'Solar study {i}', 'url': f'https://example.edu/{i}', 'credibility_score': 0.8,
+             'summary': text, 'core_argument': text, 'evidence_used': text, 'conclusion': text}
+            for i in range(count)]
+
+
+def test_budgeted_prompt_fits_including_system_prompt_and_framing():
+    generator = InsightGenerator(max_prompt_tokens=6000)
+    for count in (5, 20, 25, 50):
+        summaries = make_summaries(count, 40)
+        prompt_tokens = estimate_tokens(SYSTEM_PROMPT + generator._format_summaries_for_analysis(summaries, 'solar output'))
+        assert prompt_tokens <= 6000
+        assert generator._cluster_count(prompt_tokens, count) == 1
+
+
+def test_map_reduce_starts_once_floor_share_does_not_fit():
+    generator = InsightGenerator(max_prompt_tokens=6000)
+    summaries = make_summaries(80, 40)
+    prompt_tokens = estimate_tokens(SYSTEM_PROMPT + generator._format_summaries_for_analysis(summaries, 'solar output'))
+    assert generator._cluster_count(prompt_tokens, len(summaries)) >= 2
@@ -0,0 +1,65 @@
+import asyncio
+
+from core.jobs import JobManager
+from core.metrics import current_trace_id
+from models.schemas import ResearchRequest
+
+
+class InstantPipeline:
+    async def stream(self, request):
+        yield {'event': 'report', 'data': {'topic': request.topic}}
+
+
+def test_finished_jobs_beyond_cap_evict_oldest_first():
+    async def scenario():
+        manager = JobManager(InstantPipeline(), max_workers=1, max_retained=3)
+        submitted = [manager.submit(ResearchRequest(topic=f'topic {i}')) for i in range(5)]
+        await manager._queue.join()
+        await manager.stop()
+        return manager, submitted
+
+    manager, submitted = asyncio.run(scenario())
+    assert [job.job_id for job in submitted if manager.get(job.job_id)] == [job.job_id for job in submitted[2:]]
+    assert manager.evicted == 2
+    assert manager.cleanup() == 0
+
+
+def test_cleanup_drops_jobs_past_ttl():
+    async def scenario():
+        manager = JobManager(InstantPipeline(), max_workers=1, ttl=0)
+        manager.submit(ResearchRequest(topic='solar panels'))
+        await manager._queue.join()
+        await manager.stop()
+        return manager
+
+    manager = asyncio.run(scenario())
+    assert manager.cleanup() == 1
+    assert manager.jobs == {}
+
+
+class TracingPipeline:
+    def __init__(self):
+        self.trace_ids = {}
+
+    async def stream(self, request):
+        self.trace_ids[request.topic] = current_trace_id.get()
+        yield {'event': 'report', 'data': {'topic': request.topic}}
+
+
+def test_jobs_run_under_the_submitting_request_trace_id():
+    pipeline = TracingPipeline()
+
+    async def submit_under(manager, trace_id, topic):
+        current_trace_id.set(trace_id)
+        manager.submit(ResearchRequest(topic=topic))
+
+    async def scenario():
+        manager = JobManager(pipeline, max_workers=1)
+        # Each submission runs in its own task context, like separate HTTP requests
+        await asyncio.create_task(submit_under(manager, 'req-A', 'topic a'))
+        await asyncio.create_task(submit_under(manager, 'req-B', 'topic b'))
+        await manager._queue.join()
+        await manager.stop()
+
+    asyncio.run(scenario())
+    assert pipeline.trace_ids == {'topic a': 'req-A', 'topic b': 'req-B'}
@@ -0,0 +1,15 @@
+from core.metrics import percentile
+
+
+def test_percentile_is_nearest_rank():
+    assert percentile([], 50) == 0.0
+    assert percentile([3.0], 99) == 3.0
+    # Exact-half ranks must not round to even
+    assert percentile([1, 2], 50) == 1
+    assert percentile([1, 2, 3, 4], 50) == 2
+    assert percentile(list(range(1, 21)), 95) == 19
+    assert percentile(list(range(1, 11)), 95) == 10
+    assert percentile(list(range(1, 101)), 99) == 99
+    assert percentile([5, 1, 4, 2, 3], 0) == 1
+    assert percentile([5, 1, 4, 2, 3], 100) == 5
+    assert percentile(list(range(1, 101)), 7) == 7
@@ -0,0 +1,17 @@
+from core.mock_ai import LatencyModel
+
+TRACE = {'summarize_source': [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8]}
+
+
+def test_seeded_replay_is_independent_of_call_order():
+    def latencies(order):
+        model = LatencyModel('replay', seed=7, trace=TRACE)
+        return {key: model.sample('summarize_source', model.rng('summarize_source', key)) for key in order}
+
+    keys = [f'https://example.edu/{i}' for i in range(6)]
+    assert latencies(keys) == latencies(list(reversed(keys)))
+
+
+def test_unseeded_replay_follows_the_trace_in_order():
+    model = LatencyModel('replay', trace=TRACE)
+    assert [model.sample('summarize_source', model.rng('summarize_source')) for _ in range(9)] == TRACE['summarize_source'] + [0.1]
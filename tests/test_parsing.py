@@ -0,0 +1,39 @@
+from core.parsing import parse_insights
+
+SUMMARIES = [{'url': 'u1', 'title': 'One'}, {'url': 'u2', 'title': 'Two'}]
+
+
+def attribute(line, summaries):
+    return {'insight': line, 'supporting_sources': ['from-text'], 'confidence_level': 'Medium'}
+
+
+def test_json_source_refs_resolve_numbers_and_drop_unresolvable():
+    response = '{"cross_insights": [{"insight": "A", "sources": [1, "Source 2", 7, "Study A", "https://x.org/p"]}]}'
+    insight = parse_insights(response, SUMMARIES, attribute)['cross_insights'][0]
+    assert insight.supporting_sources == ['u1', 'u2', 'https://x.org/p']
+
+
+def test_json_insight_with_only_unresolvable_refs_is_attributed_from_text():
+    response = '{"cross_insights": [{"insight": "A", "sources": [7], "confidence": "high"}]}'
+    insight = parse_insights(response, SUMMARIES, attribute)['cross_insights'][0]
+    assert insight.supporting_sources == ['from-text']
+    assert insight.confidence_level == 'High'
+
+
+def test_batch_response_ignores_echoed_source_headers():
+    from core.parsing import split_batch_response
+
+    response = """=== SOURCE 1 ===
+Title: Echoed prompt
+Content: echoed source text
+=== SUMMARY 1 ===
+SUMMARY: Real summary one.
+=== SOURCE 2 ===
+Content: more echoed text
+=== SUMMARY 2 ===
+SUMMARY: Real summary two.
+"""
+    sections = split_batch_response(response)
+    assert sorted(sections) == [1, 2]
+    assert 'Real summary one.' in sections[1] and 'echoed' not in sections[1]
+    assert 'Real summary two.' in sections[2] and 'echoed' not in sections[2]
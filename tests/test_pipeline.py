@@ -0,0 +1,32 @@
+import asyncio
+
+from core.cache import StaleWhileRevalidateCache
+from core.metrics import current_trace_id
+from core.pipeline import ResearchPipeline
+
+
+class TracingSearcher:
+    cache_scope = 'tracing'
+
+    def __init__(self):
+        self.trace_ids = []
+
+    async def search_sources(self, topic, max_results):
+        self.trace_ids.append(current_trace_id.get())
+        return [{'title': topic, 'url': 'https://example.edu/a', 'content': topic}]
+
+
+def test_stale_revalidation_runs_under_its_own_trace_id():
+    searcher = TracingSearcher()
+    pipeline = ResearchPipeline(searcher, None, None, search_cache=StaleWhileRevalidateCache(ttl=0, stale_ttl=60))
+
+    async def scenario():
+        current_trace_id.set('req-A')
+        await pipeline.search_sources('solar panels')
+        current_trace_id.set('req-B')
+        await pipeline.search_sources('solar panels')
+        await asyncio.gather(*pipeline._revalidating.values())
+
+    asyncio.run(scenario())
+    assert searcher.trace_ids[0] == 'req-A'
+    assert len(searcher.trace_ids) == 2 and searcher.trace_ids[1] not in ('req-A', 'req-B', '-')
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from core.scheduler import PrioritySemaphore
+
+
+def test_cancelled_waiter_skipped_by_release_raises_cancelled():
+    async def scenario():
+        semaphore = PrioritySemaphore(1)
+        await semaphore.acquire()
+
+        waiter = asyncio.create_task(semaphore.acquire())
+        await asyncio.sleep(0)
+
+        # Cancel the queued waiter and release before it gets to run again
+        waiter.cancel()
+        semaphore.release()
+
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return semaphore
+
+    semaphore = asyncio.run(scenario())
+    assert semaphore.in_use == 0
+    assert semaphore._waiters == []
+
+
+def test_release_hands_slot_to_highest_priority_waiter():
+    async def scenario():
+        semaphore = PrioritySemaphore(1)
+        await semaphore.acquire()
+        order = []
+
+        async def worker(name, priority):
+            await semaphore.acquire(priority)
+            order.append(name)
+            semaphore.release()
+
+        tasks = [asyncio.create_task(worker('batch', 1)), asyncio.create_task(worker('interactive', 0))]
+        await asyncio.sleep(0)
+        semaphore.release()
+        await asyncio.gather(*tasks)
+        return order, semaphore
+
+    order, semaphore = asyncio.run(scenario())
+    assert order == ['interactive', 'batch']
+    assert semaphore.in_use == 0
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+
+from core.store import ReportStore
+from models.schemas import ResearchReport
+
+
+def make_report(topic, timestamp):
+    return ResearchReport(topic=topic, timestamp=timestamp, sources_analyzed=0, reasoning_steps=[],
+                          article_summaries=[], cross_insights=[], contradictions=[], emerging_trends=[],
+                          key_takeaways=[])
+
+
+def test_list_returns_source_urls_in_order_for_each_report(tmp_path):
+    store = ReportStore(str(tmp_path / "reports.db"))
+    now = datetime.now()
+    first = store.save(make_report('solar', now - timedelta(hours=1)),
+                       [{'url': 'https://a.edu/2', 'content': 'b'}, {'url': 'https://a.edu/1', 'content': 'a'}])
+    second = store.save(make_report('wind', now), [])
+
+    records, total = store.list()
+    assert total == 2
+    assert [r['id'] for r in records] == [second, first]
+    assert records[0]['source_urls'] == []
+    assert records[1]['source_urls'] == ['https://a.edu/2', 'https://a.edu/1']
+
+    records, total = store.list(limit=1, offset=1)
+    assert total == 2 and [r['id'] for r in records] == [first]
+    store.close()
+
+
+def test_list_time_filters_accept_timezone_aware_datetimes(tmp_path):
+    store = ReportStore(str(tmp_path / "reports.db"))
+    created = datetime.now().replace(microsecond=0)
+    report_id = store.save(make_report('solar', created), [])
+
+    aware = created.astimezone(timezone(timedelta(hours=-11)))
+    assert [r['id'] for r in store.list(since=aware - timedelta(minutes=1))[0]] == [report_id]
+    assert store.list(since=aware + timedelta(minutes=1))[0] == []
+    assert [r['id'] for r in store.list(until=aware + timedelta(minutes=1))[0]] == [report_id]
+    assert store.list(until=aware - timedelta(minutes=1))[0] == []
+    store.close()